@@ -0,0 +1,152 @@
+from collections import Counter
+from typing import Any, Hashable, Iterable, Optional, Union
+
+from cvss import SEVERITIES, CVSSv4
+
+
+class SeverityAggregator:
+    """
+    Streaming aggregate of CVSS 4.0 findings.
+
+    Memory use is bounded by the size of the CVSS 4.0 space, not by the number of findings:
+    there are 5 severity bands, 4 nomenclatures, 270 macro vectors and 101 possible scores
+    (0.0 to 10.0 in steps of 0.1). Because scores are already rounded to one decimal place,
+    the score histogram gives exact quantiles.
+
+    Partial aggregates built in separate processes can be combined with `merge`. They can be
+    pickled as-is or shipped as plain data with `to_dict` and `from_dict`.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.severities: Counter[str] = Counter()
+        self.nomenclatures: Counter[str] = Counter()
+        self.macro_vectors: Counter[str] = Counter()
+        # Score histogram keyed by score * 10, i.e. 0..100
+        self.scores: Counter[int] = Counter()
+
+    def add(self, record: Union[str, CVSSv4]) -> None:
+        """
+        Adds a single finding to the aggregate.
+
+        Args:
+            record (Union[str, CVSSv4]): A CVSS 4.0 vector string or an already scored CVSSv4 object.
+        """
+        cvss = record if isinstance(record, CVSSv4) else CVSSv4(record)
+        score = cvss.get_score()
+        self.count += 1
+        self.total += score
+        self.severities[cvss.get_severity()] += 1
+        self.nomenclatures[cvss.get_nomenclature()] += 1
+        self.macro_vectors[cvss.get_macro_vector()] += 1
+        self.scores[round(score * 10)] += 1
+
+    def consume(self, records: Iterable[Union[str, CVSSv4]]) -> "SeverityAggregator":
+        """
+        Adds every finding produced by an iterable, typically a generator.
+
+        Args:
+            records (Iterable[Union[str, CVSSv4]]): Vector strings or CVSSv4 objects.
+
+        Returns:
+            SeverityAggregator: The aggregator itself, to allow chaining.
+        """
+        for record in records:
+            self.add(record)
+        return self
+
+    def merge(self, other: "SeverityAggregator") -> "SeverityAggregator":
+        """
+        Folds another partial aggregate into this one.
+
+        Args:
+            other (SeverityAggregator): The aggregate to merge in. It is left unchanged.
+
+        Returns:
+            SeverityAggregator: The aggregator itself, to allow chaining.
+        """
+        self.count += other.count
+        self.total += other.total
+        self.severities.update(other.severities)
+        self.nomenclatures.update(other.nomenclatures)
+        self.macro_vectors.update(other.macro_vectors)
+        self.scores.update(other.scores)
+        return self
+
+    def mean(self) -> Optional[float]:
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Returns the lowest score such that at least a fraction q of the findings score at or below it.
+
+        Args:
+            q (float): The requested quantile, between 0 and 1.
+
+        Returns:
+            Optional[float]: The score at that quantile, or None if nothing was aggregated.
+        """
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("Quantile must be between 0 and 1")
+        if self.count == 0:
+            return None
+        threshold = max(1, q * self.count)
+        seen = 0
+        for bucket in sorted(self.scores):
+            seen += self.scores[bucket]
+            if seen >= threshold:
+                return bucket / 10.0
+        return max(self.scores) / 10.0
+
+    def top_macro_vectors(self, n: int = 10) -> list[tuple[str, int]]:
+        return self.macro_vectors.most_common(n)
+
+    def severity_histogram(self) -> dict[str, int]:
+        return {severity: self.severities.get(severity, 0) for severity in SEVERITIES}
+
+    def score_histogram(self) -> dict[float, int]:
+        return {bucket / 10.0: self.scores[bucket] for bucket in sorted(self.scores)}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "severities": dict(self.severities),
+            "nomenclatures": dict(self.nomenclatures),
+            "macro_vectors": dict(self.macro_vectors),
+            # JSON object keys are strings, so keep the score buckets as a list of pairs
+            "scores": sorted(self.scores.items()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SeverityAggregator":
+        aggregator = cls()
+        aggregator.count = data["count"]
+        aggregator.total = data["total"]
+        aggregator.severities.update(data["severities"])
+        aggregator.nomenclatures.update(data["nomenclatures"])
+        aggregator.macro_vectors.update(data["macro_vectors"])
+        aggregator.scores.update({int(bucket): n for bucket, n in data["scores"]})
+        return aggregator
+
+
+def aggregate_by(records: Iterable[tuple[Hashable, Union[str, CVSSv4]]]) -> dict[Hashable, SeverityAggregator]:
+    """
+    Aggregates a stream of (group, finding) pairs, e.g. (product, vector), into one aggregate per group.
+
+    Args:
+        records (Iterable[tuple[Hashable, Union[str, CVSSv4]]]): Pairs of group key and finding.
+
+    Returns:
+        dict[Hashable, SeverityAggregator]: The aggregate for each group seen in the stream.
+    """
+    groups: dict[Hashable, SeverityAggregator] = {}
+    for group, record in records:
+        aggregator = groups.get(group)
+        if aggregator is None:
+            aggregator = groups[group] = SeverityAggregator()
+        aggregator.add(record)
+    return groups
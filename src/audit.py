@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+from typing import Any, Iterable, Optional
+
+from cvss import CVSSv4
+from pipeline import Pipeline, Record, feed_records
+
+# Audit of NVD-supplied CVSS 4.0 base scores against local scoring.
+#
+#     python audit.py nvdcve-2.0-*.json.gz --report audit.json
+#
+# streams every CVSS 4.0 entry of the feed files, rescores its vector with CVSSv4 in a process
+# pool and reports the entries whose NVD baseScore differs, grouped by macro vector. Vectors that
+# are not valid CVSS 4.0 vectors are reported separately, as they have no meaningful local score.
+
+
+def rescore(record: Record) -> Record:
+    try:
+        CVSSv4.validate(record["vector"])
+    except ValueError as e:
+        record["invalid"] = str(e)
+        return record
+    cvss = CVSSv4(record["vector"])
+    record["local_score"] = cvss.get_score()
+    record["macro_vector"] = cvss.get_macro_vector()
+    return record
+
+
+class AuditReport:
+
+    def __init__(self, max_examples: int = 10) -> None:
+        self.max_examples = max_examples
+        self.checked = 0
+        self.mismatches = 0
+        self.missing = 0
+        self.invalid = 0
+        self.invalid_examples: list[dict[str, Any]] = []
+        # macro vector -> [count, examples]
+        self.by_macro_vector: dict[str, list[Any]] = {}
+
+    def add(self, record: Record) -> None:
+        self.checked += 1
+        if "invalid" in record:
+            self.invalid += 1
+            if len(self.invalid_examples) < self.max_examples:
+                self.invalid_examples.append(
+                    {"cve_id": record["cve_id"], "vector": record["vector"], "reason": record["invalid"]})
+            return
+        nvd_score: Optional[float] = record["base_score"]
+        if nvd_score is None:
+            self.missing += 1
+            return
+        if round(float(nvd_score), 1) == record["local_score"]:
+            return
+        self.mismatches += 1
+        group = self.by_macro_vector.setdefault(record["macro_vector"], [0, []])
+        group[0] += 1
+        if len(group[1]) < self.max_examples:
+            group[1].append({
+                "cve_id": record["cve_id"],
+                "vector": record["vector"],
+                "nvd_score": nvd_score,
+                "local_score": record["local_score"],
+            })
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "checked": self.checked,
+            "mismatches": self.mismatches,
+            "missing_base_score": self.missing,
+            "invalid": {"count": self.invalid, "examples": self.invalid_examples},
+            "by_macro_vector": {
+                macro_vector: {"count": count, "examples": examples}
+                for macro_vector, (count, examples) in sorted(
+                    self.by_macro_vector.items(), key=lambda item: (-item[1][0], item[0]))
+            },
+        }
+
+
+def audit(paths: Iterable[str], workers: Optional[int] = None, max_examples: int = 10) -> AuditReport:
+    """
+    Rescores every CVSS 4.0 entry of local NVD 2.0 feed files and collects the score discrepancies.
+
+    Args:
+        paths (Iterable[str]): NVD 2.0 JSON feed files, plain or gzipped.
+        workers (Optional[int]): Scoring processes. Defaults to the number of CPUs.
+        max_examples (int): Example CVEs kept per macro vector.
+
+    Returns:
+        AuditReport: Exact mismatch counts per macro vector, with examples.
+    """
+    report = AuditReport(max_examples)
+    pipeline = Pipeline(feed_records(paths)).map(
+        rescore, name="rescore", workers=workers or os.cpu_count() or 1, mode="process", chunksize=256)
+    pipeline.run(report.add)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare NVD CVSS 4.0 base scores with local scoring.")
+    parser.add_argument("feeds", nargs="+", help="NVD 2.0 JSON feed files, plain or gzipped")
+    parser.add_argument("--report", help="Write the full report to this JSON file")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--examples", type=int, default=10, help="Example CVEs per macro vector")
+    args = parser.parse_args()
+
+    report = audit(args.feeds, args.workers, args.examples)
+    print(f"Checked {report.checked} CVSS 4.0 entries: {report.mismatches} mismatches, "
+          f"{report.missing} without base score, {report.invalid} invalid vectors")
+    for macro_vector, group in report.to_dict()["by_macro_vector"].items():
+        examples = ", ".join(example["cve_id"] for example in group["examples"][:3])
+        print(f"  {macro_vector}: {group['count']:>6}  e.g. {examples}")
+    if report.invalid:
+        examples = ", ".join(example["cve_id"] for example in report.invalid_examples[:3])
+        print(f"  invalid: {report.invalid:>6}  e.g. {examples}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+from cvss import CVSSv4
+
+T = TypeVar("T")
+
+
+class BatchResult:
+    """
+    Scores of a batch, stored once per distinct vector.
+
+    `unique` holds one CVSSv4 object per canonical vector and `inverse[i]` is the position in
+    `unique` of the i-th input. Indexing the result returns the shared CVSSv4 object for that
+    input, so its `get_vector()` is the canonical form rather than the original input string.
+    """
+
+    def __init__(self, unique: list[CVSSv4], inverse: list[int]) -> None:
+        self.unique = unique
+        self.inverse = inverse
+
+    def __len__(self) -> int:
+        return len(self.inverse)
+
+    def __getitem__(self, index: int) -> CVSSv4:
+        return self.unique[self.inverse[index]]
+
+    def __iter__(self) -> Iterator[CVSSv4]:
+        unique = self.unique
+        return (unique[i] for i in self.inverse)
+
+    def scores(self) -> list[float]:
+        unique_scores = [cvss.get_score() for cvss in self.unique]
+        return [unique_scores[i] for i in self.inverse]
+
+    def severities(self) -> list[str]:
+        unique_severities = [cvss.get_severity() for cvss in self.unique]
+        return [unique_severities[i] for i in self.inverse]
+
+    @property
+    def dedup_ratio(self) -> float:
+        """
+        Number of inputs per distinct vector, i.e. the reduction in scoring work. 1.0 means no duplicates.
+        """
+        if not self.unique:
+            return 1.0
+        return len(self.inverse) / len(self.unique)
+
+
+def score_batch(records: Iterable[T], key: Optional[Callable[[T], str]] = None) -> BatchResult:
+    """
+    Scores a batch of vectors, computing each distinct vector only once.
+
+    Vectors are grouped by `CVSSv4.canonicalize`, so inputs that differ only in 'X' metrics or
+    metric order share a single CVSSv4 object. Only the first occurrence of each input string is
+    canonicalized; repeats are a dictionary lookup. The input records are never copied or kept.
+
+    Args:
+        records (Iterable[T]): Vector strings, or arbitrary records if `key` is given.
+        key (Optional[Callable[[T], str]]): Extracts the vector string from a record.
+
+    Returns:
+        BatchResult: The scores, in input order.
+    """
+    # Raw input string -> position, in front of canonical vector -> position
+    seen: dict[str, int] = {}
+    positions: dict[str, int] = {}
+    unique: list[CVSSv4] = []
+    inverse: list[int] = []
+    for record in records:
+        vector = key(record) if key is not None else record
+        position = seen.get(vector)  # type: ignore[arg-type]
+        if position is None:
+            canonical = CVSSv4.canonicalize(vector)  # type: ignore[arg-type]
+            position = positions.get(canonical)
+            if position is None:
+                position = positions[canonical] = len(unique)
+                unique.append(CVSSv4(canonical))
+            seen[vector] = position  # type: ignore[index]
+        inverse.append(position)
+    return BatchResult(unique, inverse)
@@ -0,0 +1,64 @@
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from cvss import CVSSv4
+from cvss_fast import score_vector
+from differential import random_vector
+
+
+def _reference(vector: str) -> float:
+    return CVSSv4(vector).get_score()
+
+
+SCORERS: dict[str, Callable[[str], float]] = {
+    "reference": _reference,
+    "fast": score_vector,
+}
+
+
+def _work(scorer: Callable[[str], float], vectors: list[str]) -> int:
+    for vector in vectors:
+        scorer(vector)
+    return len(vectors)
+
+
+def bench(scorer: Callable[[str], float], vectors: list[str], threads: int) -> float:
+    """
+    Scores `vectors` once in every thread and returns the aggregate throughput in vectors per second.
+    """
+    with ThreadPoolExecutor(threads) as executor:
+        start = time.perf_counter()
+        done = sum(executor.map(lambda _: _work(scorer, vectors), range(threads)))
+        elapsed = time.perf_counter() - start
+    return done / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure how CVSS 4.0 scoring scales with the number of threads.")
+    parser.add_argument("--vectors", type=int, default=5000, help="Vectors scored by each thread")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--scorer", choices=sorted(SCORERS), action="append")
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+
+    rng = random.Random(0)
+    vectors = [random_vector(rng) for _ in range(args.vectors)]
+
+    print(f"{'Scorer':<12}{'Threads':>8}{'Vectors/s':>14}{'Scaling':>10}")
+    for name in args.scorer or sorted(SCORERS):
+        scorer = SCORERS[name]
+        single = None
+        for threads in args.threads:
+            rate = bench(scorer, vectors, threads)
+            single = single or rate
+            print(f"{name:<12}{threads:>8}{rate:>14,.0f}{rate / single:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
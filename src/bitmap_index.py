@@ -0,0 +1,149 @@
+import re
+from typing import Iterable, Iterator
+
+from cvss import SEVERITIES, CVSSv4
+from cvss_fast import severity_vector
+
+# In-memory bitmap index over a collection of CVSS 4.0 vectors.
+#
+#     index = BitmapIndex(vectors)
+#     rows = index.query("AV:N and UI:N and (MSI:S or MSA:S) and not E:U and severity:Critical")
+#
+# Row i is the i-th vector of the collection. There is one bitmap per (metric, value) pair of the
+# specification, with 'X' standing for a metric that is not set, and one per severity band, so
+# every query is a handful of bitwise operations on Python integers. Bitmaps are dense: each one
+# takes n / 8 bytes for n rows, about 130 bitmaps in all.
+
+_TOKEN = re.compile(r"\s*(\(|\)|[A-Za-z]+:[A-Za-z]+|[A-Za-z]+)")
+
+
+class BitmapIndex:
+
+    def __init__(self, vectors: Iterable[str]) -> None:
+        """
+        Args:
+            vectors (Iterable[str]): CVSS 4.0 vector strings. Each distinct vector is parsed and scored once.
+        """
+        metric_values = CVSSv4.metric_values()
+        # Bits are set in place, so building takes no more memory than the finished index
+        bits: dict[tuple[str, str], bytearray] = {
+            (metric, value): bytearray() for metric, values in metric_values.items() for value in values + ["X"]
+        }
+        for severity in SEVERITIES:
+            bits[("severity", severity)] = bytearray()
+
+        seen: dict[str, list[bytearray]] = {}
+        size = 0
+        for row, vector in enumerate(vectors):
+            row_bits = seen.get(vector)
+            if row_bits is None:
+                metrics = CVSSv4.parse_metrics(vector)
+                row_bits = [bits[(metric, metrics.get(metric, "X"))] for metric in metric_values]
+                row_bits.append(bits[("severity", severity_vector(vector))])
+                seen[vector] = row_bits
+            byte, mask = row >> 3, 1 << (row & 7)
+            if byte == len(row_bits[0]):
+                for key_bits in bits.values():
+                    key_bits.append(0)
+            for key_bits in row_bits:
+                key_bits[byte] |= mask
+            size = row + 1
+
+        self.__metrics = frozenset(metric_values)
+        self.__size = size
+        self.__all = (1 << size) - 1
+        self.__bitmaps: dict[tuple[str, str], int] = {
+            key: int.from_bytes(key_bits, "little") for key, key_bits in bits.items()
+        }
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def bitmap(self, metric: str, value: str) -> int:
+        """
+        Returns the bitmap of the rows where `metric` has `value`. Use metric "severity" for severity bands.
+
+        Raises ValueError for a metric or value the specification does not define.
+        """
+        if metric != "severity" and metric not in self.__metrics:
+            raise ValueError(f"Unknown metric: {metric}")
+        bitmap = self.__bitmaps.get((metric, value))
+        if bitmap is None:
+            raise ValueError(f"Invalid value for {metric}: {value}")
+        return bitmap
+
+    def evaluate(self, expression: str) -> int:
+        """
+        Evaluates a filter such as "AV:N and not (E:U or severity:Low)" to a bitmap of matching rows.
+
+        Terms are "METRIC:VALUE" or "severity:BAND", combined with "and", "or", "not" and parentheses.
+        "and" binds tighter than "or".
+        """
+        tokens = _TOKEN.findall(expression)
+        if "".join(tokens) != re.sub(r"\s+", "", expression):
+            raise ValueError(f"Invalid filter: {expression}")
+        position = 0
+
+        def peek() -> str:
+            return tokens[position].lower() if position < len(tokens) else ""
+
+        def take() -> str:
+            nonlocal position
+            if position >= len(tokens):
+                raise ValueError(f"Unexpected end of filter: {expression}")
+            position += 1
+            return tokens[position - 1]
+
+        def parse_or() -> int:
+            result = parse_and()
+            while peek() == "or":
+                take()
+                result |= parse_and()
+            return result
+
+        def parse_and() -> int:
+            result = parse_not()
+            while peek() == "and":
+                take()
+                result &= parse_not()
+            return result
+
+        def parse_not() -> int:
+            if peek() == "not":
+                take()
+                return self.__all & ~parse_not()
+            return parse_term()
+
+        def parse_term() -> int:
+            token = take()
+            if token == "(":
+                result = parse_or()
+                if take() != ")":
+                    raise ValueError(f"Missing closing parenthesis: {expression}")
+                return result
+            if ":" not in token:
+                raise ValueError(f"Unexpected '{token}' in filter: {expression}")
+            metric, value = token.split(":", 1)
+            return self.bitmap(metric, value)
+
+        result = parse_or()
+        if position != len(tokens):
+            raise ValueError(f"Unexpected '{tokens[position]}' in filter: {expression}")
+        return result
+
+    def count(self, expression: str) -> int:
+        return bin(self.evaluate(expression)).count("1")
+
+    def query(self, expression: str) -> list[int]:
+        """
+        Returns the row numbers matching a filter, in ascending order. See `evaluate` for the syntax.
+        """
+        return list(self.rows(self.evaluate(expression)))
+
+    def rows(self, bitmap: int) -> Iterator[int]:
+        data = bitmap.to_bytes((self.__size + 7) // 8, "little")
+        for byte_index, byte in enumerate(data):
+            while byte:
+                low = byte & -byte
+                yield byte_index * 8 + low.bit_length() - 1
+                byte ^= low
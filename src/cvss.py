@@ -1,8 +1,55 @@
-from typing import Any
+from typing import Any, NamedTuple, Optional
 
 from utils import trim_cvss_vector
 
 
+# Qualitative severity ratings, from lowest to highest
+SEVERITIES: tuple[str, ...] = ("None", "Low", "Medium", "High", "Critical")
+
+# Metrics every CVSS 4.0 vector must define
+BASE_METRICS: tuple[str, ...] = ("AV", "AC", "AT", "PR", "UI", "VC", "VI", "VA", "SC", "SI", "SA")
+
+
+def severity_from_score(score: float) -> str:
+    """
+    Map a CVSS 4.0 score to its qualitative severity rating.
+
+    Parameters:
+    score (float): The score, between 0.0 and 10.0.
+
+    Returns:
+    str: One of 'None', 'Low', 'Medium', 'High' or 'Critical'.
+    """
+    if score == 0.0:
+        return "None"
+    elif score < 4.0:
+        return "Low"
+    elif score < 7.0:
+        return "Medium"
+    elif score < 9.0:
+        return "High"
+    else:
+        return "Critical"
+
+
+class ScoreExplanation(NamedTuple):
+    """
+    Intermediate values of a CVSS 4.0 score computation, as returned by CVSSv4.explain().
+
+    For vectors without any impact the score is 0.0 by shortcut: max_vector is None and the
+    distance dictionaries are empty.
+    """
+    macro_vector: str
+    lookup_value: float
+    max_vector: Optional[str]
+    severity_distances: dict[str, float]
+    available_distances: dict[str, float]
+    proportions: dict[str, float]
+    normalized_severity: dict[str, float]
+    mean_distance: float
+    score: float
+
+
 class CVSSv4:
 
     __cvss_lookup_global: dict[str, float] = {
@@ -382,19 +429,26 @@ class CVSSv4:
         },
     }
 
-    def __init__(self, vector_string: str) -> None:
+    def __init__(self, vector_string: str, explain: bool = False) -> None:
         self.__vector_string = trim_cvss_vector(vector_string)
         self.__metrics: dict[str, str] = {}
+        self.__explain = explain
+        self.__explanation: Optional[ScoreExplanation] = None
         self.__parse_vector()
         self.__macro_vector_result = self.__compute_macro_vector()
         self.__score = self.__calculate_score()
 
     def __parse_vector(self) -> None:
+        self.__metrics = self.__split_metrics(self.__vector_string)
+
+    @classmethod
+    def __split_metrics(cls, vector_string: str) -> dict[str, str]:
+        metrics: dict[str, str] = {}
         # Remove the "CVSS:4.0/" prefix if present
-        if self.__vector_string.startswith('CVSS:4.0/'):
-            vector_body = self.__vector_string[9:]
+        if vector_string.startswith('CVSS:4.0/'):
+            vector_body = vector_string[9:]
         else:
-            vector_body = self.__vector_string
+            vector_body = vector_string
 
         # Split the vector into metric pairs
         metric_pairs: list[str] = vector_body.split('/')
@@ -404,12 +458,78 @@ def __parse_vector(self) -> None:
                 continue
             metric, value = pair.split(':', 1)
             # Validate metric
-            if metric not in self.__expected_metric_order:
+            if metric not in cls.__expected_metric_order:
                 continue
             # Validate value
-            if value not in self.__expected_metric_order[metric]:
+            if value not in cls.__expected_metric_order[metric]:
                 continue
-            self.__metrics[metric] = value
+            metrics[metric] = value
+        return metrics
+
+    @classmethod
+    def metric_values(cls) -> dict[str, list[str]]:
+        """
+        Return every metric of the specification with its valid values, in specification order.
+        """
+        return {metric: list(values) for metric, values in cls.__expected_metric_order.items()}
+
+    @classmethod
+    def parse_metrics(cls, vector_string: str) -> dict[str, str]:
+        """
+        Return the valid metrics of a vector as parsed for scoring, without applying any defaults.
+
+        Parameters:
+        vector_string (str): The CVSS 4.0 vector string.
+
+        Returns:
+        dict[str, str]: Metric abbreviation to value, for the metrics present in the vector.
+        """
+        return cls.__split_metrics(trim_cvss_vector(vector_string))
+
+    @classmethod
+    def canonicalize(cls, vector_string: str) -> str:
+        """
+        Return the canonical form of a vector: 'X' values and unknown metrics dropped, metrics in specification order.
+
+        Two vectors with the same canonical form always have the same score, severity and nomenclature.
+
+        Parameters:
+        vector_string (str): The CVSS 4.0 vector string to normalize.
+
+        Returns:
+        str: The canonical vector string, prefixed with "CVSS:4.0/".
+        """
+        return cls.__join_metrics(cls.parse_metrics(vector_string))
+
+    @classmethod
+    def validate(cls, vector_string: str) -> str:
+        """
+        Check that a string is a CVSS 4.0 vector defining every base metric, and return its canonical form.
+
+        Parameters:
+        vector_string (str): The CVSS 4.0 vector string to check.
+
+        Returns:
+        str: The canonical vector string, as returned by canonicalize.
+
+        Raises:
+        ValueError: If the string is prefixed with another CVSS version, or a base metric is missing or invalid.
+        """
+        if vector_string.startswith("CVSS:") and not vector_string.startswith("CVSS:4.0/"):
+            raise ValueError(f"Not a CVSS 4.0 vector: {vector_string}")
+        metrics = cls.parse_metrics(vector_string)
+        missing = [metric for metric in BASE_METRICS if metric not in metrics]
+        if missing:
+            raise ValueError(f"Missing or invalid base metrics {', '.join(missing)}: {vector_string}")
+        return cls.__join_metrics(metrics)
+
+    @classmethod
+    def __join_metrics(cls, metrics: dict[str, str]) -> str:
+        return "CVSS:4.0/" + "/".join(
+            f"{metric}:{metrics[metric]}"
+            for metric in cls.__expected_metric_order
+            if metrics.get(metric, 'X') != 'X'
+        )
 
     def __get_metric_value(self, metric: str) -> str:
         """
@@ -647,6 +767,9 @@ def __calculate_score(self) -> float:
         # Exception for no impact on system (shortcut)
         impact_metrics: list[str] = ["VC", "VI", "VA", "SC", "SI", "SA"]
         if all(self.__get_metric_value(metric) == "N" for metric in impact_metrics):
+            if self.__explain:
+                self.__explanation = ScoreExplanation(
+                    self.__macro_vector_result, value, None, {}, {}, {}, {}, 0.0, 0.0)
             return 0.0
 
         # Step 2: Get Maximal Vectors
@@ -685,26 +808,44 @@ def __calculate_score(self) -> float:
         # Round the adjusted score to one decimal place
         final_score: float = round(adjusted_score * 10) / 10.0
 
+        # Keep the intermediate values only when they were asked for
+        if self.__explain:
+            proportions: dict[str, float] = {
+                eq: severity_distances[eq] / (available * 0.1) if available else 0.0
+                for eq, available in available_distances.items()
+            }
+            self.__explanation = ScoreExplanation(
+                self.__macro_vector_result, value, max_vector, severity_distances, available_distances,
+                proportions, normalized_severity, mean_distance, final_score)
+
         return final_score
 
     def get_score(self) -> float:
         return self.__score
 
+    def explain(self) -> ScoreExplanation:
+        """
+        Return the intermediate values behind the score.
+
+        They are recorded during scoring when the object is built with explain=True. Otherwise
+        the vector is scored again, so pass explain=True when explaining many vectors.
+
+        Returns:
+        ScoreExplanation: The macro vector, max vector, distances and proportions used for the score.
+        """
+        if self.__explanation is None:
+            return CVSSv4(self.__vector_string, explain=True).explain()
+        return self.__explanation
+
     def get_severity(self) -> str:
-        if self.__score == 0.0:
-            return "None"
-        elif self.__score < 4.0:
-            return "Low"
-        elif self.__score < 7.0:
-            return "Medium"
-        elif self.__score < 9.0:
-            return "High"
-        else:
-            return "Critical"
+        return severity_from_score(self.__score)
 
     def get_vector(self) -> str:
         return self.__vector_string
 
+    def get_macro_vector(self) -> str:
+        return self.__macro_vector_result
+
     def get_nomenclature(self) -> str:
         """
         Determine the CVSS nomenclature based on the metrics provided.
@@ -1,4 +1,7 @@
 import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
 
 from cvss import CVSSv4
 from nvd import Nvd
@@ -158,16 +161,34 @@
     },
 }
 
-def iterate_questions(questions: dict, vector:str) -> str:
+def apply_answers(vector: str, answers: dict[str, str], metrics: Optional[Iterable[str]] = None) -> str:
+    """
+    Set every metric covered by the questions to its answer, or to "X" (Not Defined) if unanswered.
+
+    Parameters:
+    - vector (str): The base CVSS vector string.
+    - answers (dict): Metric abbreviation to selected value, e.g. {"CR": "H", "MAV": "L"}.
+    - metrics (Iterable[str]): The metrics to set. Defaults to those of the questions dictionary.
+    """
+    vector_dict: dict[str, str] = vector_to_dict(vector)
+    for metric in (questions if metrics is None else metrics):
+        vector_dict[metric] = answers.get(metric, "X")
+    return dict_to_vector(vector_dict)
+
+def iterate_questions(questions: dict, vector:str, defaults: Optional[dict[str, str]] = None, live: bool = False) -> str:
     """
     Loop through the questions dictionary, prompt the user for inputs,
     and update the vector dictionary with selected values.
 
     Parameters:
     - questions (dict): The dictionary containing the metrics, questions, and options.
-    - vector_dict (dict): The dictionary to be updated with the user's input.
+    - vector (str): The base CVSS vector string.
+    - defaults (dict): Answers used when the user just presses Enter, e.g. those given for a previous CVE.
+      Unlisted metrics default to "X".
+    - live (bool): Print the recalculated score after each answer.
     """
-    vector_dict: dict[str, str] = vector_to_dict(vector)
+    defaults = defaults or {}
+    answers: dict[str, str] = {}
     for metric, details in questions.items():
         # Display the metric title and question, along with available options
         print(f"\n\n### {details['title']} ###")
@@ -176,38 +197,30 @@ def iterate_questions(questions: dict, vector:str) -> str:
             print(f"  - {key}: {description}")
 
         # Get the user input
+        default = defaults.get(metric, "X")
+        if default not in details['options']:
+            default = "X"
         while True:
-            response = input(f"{details['question']} [X]: ").strip().upper()
+            response = input(f"{details['question']} [{default}]: ").strip().upper()
             if response == "":
-                print(f"Keeping default: X")
-                vector_dict[metric] = "X"
+                print(f"Keeping default: {default}")
+                answers[metric] = default
                 break
             elif response in details['options']:
                 print(f"Selected: {details['options'][response]}")
-                vector_dict[metric] = response
+                answers[metric] = response
                 break
             else:
                 print("Invalid input. Please select from the available options.")
-    return dict_to_vector(vector_dict)
 
-def main() -> None:
-    print("### CVSS 4.0 Tailoring Tool ###")
-    cve_id = input("Enter the CVE ID (e.g., CVE-2024-1234): ").strip()
-
-    match = re.match(r"^CVE-\d{4}-\d{4,}$", cve_id)
-    if not match:
-        print("Invalid CVE ID format. Please enter a valid CVE ID (e.g., CVE-2024-1234).")
-        return
-
-    base_data = Nvd().get_cve(cve_id)
-    if not base_data:
-        print(f"Failed to fetch CVE data for {cve_id}. Exiting.")
-        return
+        if live:
+            # Unanswered metrics count with their defaults, i.e. what Enter would give from here on
+            current = CVSSv4(apply_answers(vector, {**defaults, **answers}, questions))
+            print(f"Current score: {current.get_score()} ({current.get_severity()})")
+    return apply_answers(vector, answers, questions)
 
+def report(cve_id: str, base_data: tuple[str, float, str], new_vector: str) -> None:
     base_vector, base_score, cvss_version = base_data
-
-    # Ask the questions and update the vector
-    new_vector = iterate_questions(questions, base_vector)
     new_cvss = CVSSv4(new_vector)
 
     print("\n### Final Report ###")
@@ -220,5 +233,42 @@ def main() -> None:
     print(f"Tailored Score        : {new_cvss.get_score()}")
     print(f"Tailored Severity     : {new_cvss.get_severity()}")
 
+def main() -> None:
+    print("### CVSS 4.0 Tailoring Tool ###")
+    # CVE IDs from the command line, or prompted for: several can be tailored in one session
+    cve_ids = sys.argv[1:] or input("Enter the CVE ID(s) (e.g., CVE-2024-1234, CVE-2024-5678): ").replace(",", " ").split()
+
+    invalid = [cve_id for cve_id in cve_ids if not re.match(r"^CVE-\d{4}-\d{4,}$", cve_id)]
+    if not cve_ids or invalid:
+        print(f"Invalid CVE ID format: {' '.join(invalid)}. Please enter a valid CVE ID (e.g., CVE-2024-1234).")
+        return
+
+    # The next CVEs are fetched by a single background thread while the questions for the
+    # current one are answered, so the prompts never wait on NVD after the first CVE.
+    # The thread owns the client; it stays quiet not to interleave with the prompts.
+    nvd = Nvd(quiet=True)
+    prefetcher = ThreadPoolExecutor(max_workers=1)
+    lookups = [prefetcher.submit(nvd.get_cve, cve_id) for cve_id in cve_ids]
+    # Environmental answers given for one CVE become the defaults for the next
+    answers: dict[str, str] = {}
+    try:
+        for cve_id, lookup in zip(cve_ids, lookups):
+            print(f"\n### {cve_id} ###")
+            base_data = lookup.result()
+            if not base_data:
+                print(f"Failed to fetch CVSS 4.0 data for {cve_id}. Skipping.")
+                continue
+            base_vector, base_score, _ = base_data
+            print(f"CVSS 4.0 Base Vector: {base_vector} | Base Score: {base_score}")
+
+            # Ask the questions and update the vector
+            new_vector = iterate_questions(questions, base_vector, answers, live=True)
+            tailored = vector_to_dict(new_vector)
+            # Exploit Maturity describes the vulnerability, not the environment, so it is not carried over
+            answers = {metric: tailored.get(metric, "X") for metric in questions if metric != "E"}
+            report(cve_id, base_data, new_vector)
+    finally:
+        prefetcher.shutdown(wait=False, cancel_futures=True)
+
 if __name__ == "__main__":
     main()
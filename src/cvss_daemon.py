@@ -0,0 +1,133 @@
+import argparse
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+from functools import lru_cache
+from typing import Callable, Iterable
+
+# Long-lived local scoring daemon and its client.
+#
+#     python cvss_daemon.py serve &
+#     python cvss_daemon.py score "CVSS:4.0/AV:N/AC:L/AT:N/PR:N/UI:N/VC:H/VI:H/VA:H/SC:N/SI:N/SA:N"
+#
+# The protocol is one vector per line in, one "score<TAB>severity<TAB>macro vector" line out,
+# or "ERR <message>". "PING" answers "PONG". Any tool that can write to a Unix socket
+# (e.g. `socat - UNIX-CONNECT:<path>`) can use it without starting Python at all.
+#
+# The client only imports the scoring modules when it has to fall back to in-process scoring,
+# so talking to a running daemon costs no table construction. The fallback scores with CVSSv4,
+# which is cheaper to import than the fast engine's tables are to build for a single call.
+
+DEFAULT_SOCKET = os.environ.get(
+    "CVSS_DAEMON_SOCKET", os.path.join(tempfile.gettempdir(), f"cvss4-{os.getuid()}.sock"))
+
+
+@lru_cache(maxsize=65536)
+def _answer(vector: str) -> str:
+    from cvss import CVSSv4, severity_from_score
+    from cvss_fast import score_and_macro_vector
+
+    score, macro_vector = score_and_macro_vector(CVSSv4.validate(vector))
+    return f"{score}\t{severity_from_score(score)}\t{macro_vector}"
+
+
+def _answer_in_process(vector: str) -> str:
+    from cvss import CVSSv4
+
+    cvss = CVSSv4(CVSSv4.validate(vector))
+    return f"{cvss.get_score()}\t{cvss.get_severity()}\t{cvss.get_macro_vector()}"
+
+
+def _handle_line(line: str, answer: Callable[[str], str] = _answer) -> str:
+    line = line.strip()
+    if line == "PING":
+        return "PONG"
+    try:
+        return answer(line)
+    except (KeyError, ValueError) as e:
+        return f"ERR {e}"
+
+
+def _interrupt(signum: int, frame: object) -> None:
+    raise KeyboardInterrupt
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self) -> None:
+        for raw in self.rfile:
+            self.wfile.write((_handle_line(raw.decode("utf-8", "replace")) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+def serve(socket_path: str = DEFAULT_SOCKET) -> None:
+    """
+    Serves scoring requests on a Unix domain socket until interrupted.
+
+    Args:
+        socket_path (str): Path of the socket file. A stale file from a previous run is replaced.
+    """
+    # Build the tables before accepting the first connection
+    _answer("CVSS:4.0/AV:N/AC:L/AT:N/PR:N/UI:N/VC:H/VI:H/VA:H/SC:N/SI:N/SA:N")
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    # Shut down cleanly, removing the socket file, when stopped by a service manager
+    signal.signal(signal.SIGTERM, _interrupt)
+    with socketserver.ThreadingUnixStreamServer(socket_path, _Handler) as server:
+        server.daemon_threads = True
+        print(f"CVSS 4.0 daemon listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+
+def score(vectors: Iterable[str], socket_path: str = DEFAULT_SOCKET) -> list[str]:
+    """
+    Scores vectors through the daemon, or in-process if no daemon is listening.
+
+    Args:
+        vectors (Iterable[str]): CVSS 4.0 vector strings.
+        socket_path (str): Path of the daemon socket.
+
+    Returns:
+        list[str]: One protocol response line per vector.
+    """
+    vectors = [vector.strip() for vector in vectors]
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            sock.sendall("".join(vector + "\n" for vector in vectors).encode("utf-8"))
+            sock.shutdown(socket.SHUT_WR)
+            with sock.makefile("r", encoding="utf-8") as f:
+                return [line.rstrip("\n") for line in f]
+    except (FileNotFoundError, ConnectionRefusedError):
+        return [_handle_line(vector, _answer_in_process) for vector in vectors]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Warm CVSS 4.0 scoring daemon and client.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("serve", help="Run the daemon")
+    score_parser = subparsers.add_parser("score", help="Score vectors (from arguments, or one per line on stdin)")
+    score_parser.add_argument("vectors", nargs="*")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.socket)
+        return
+
+    responses = score(args.vectors or sys.stdin, args.socket)
+    print("\n".join(responses))
+    if any(response.startswith("ERR") for response in responses):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+from functools import cache
+from itertools import product
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional
+
+from cvss import CVSSv4, severity_from_score
+from utils import trim_cvss_vector
+
+# Stateless, reentrant implementation of CVSSv4.__calculate_score.
+#
+# The scoring tables below are derived once, at import time, from the private tables of CVSSv4
+# so that the two implementations cannot drift apart, and are then frozen (tuples and
+# MappingProxyType). `score_vector` and the other plain scoring functions only read them and
+# keep no state of their own, so any number of threads can call them concurrently. The
+# exceptions are the severity band table, built on first use behind functools.cache (a race
+# only builds the same table twice), and SeverityClassifier, whose counters are per instance.
+# Results are checked against CVSSv4 by differential.py.
+
+
+def _private(name: str):
+    return getattr(CVSSv4, f"_CVSSv4__{name}")
+
+
+# Metrics that take part in scoring, in the order used by CVSSv4.__is_vector_greater_or_equal
+_METRICS: tuple[str, ...] = tuple(_private("metric_levels"))
+(_AV, _PR, _UI, _AC, _AT, _VC, _VI, _VA, _SC, _SI, _SA, _CR, _IR, _AR, _E) = range(len(_METRICS))
+
+_VALID: Mapping[str, frozenset[str]] = MappingProxyType(
+    {metric: frozenset(values) for metric, values in _private("expected_metric_order").items()})
+_LEVELS: tuple[Mapping[str, float], ...] = tuple(
+    MappingProxyType(dict(_private("metric_levels")[metric])) for metric in _METRICS)
+
+# Positions in _METRICS of the metrics of each EQ, in the order CVSSv4.__get_eq_metrics lists them
+_EQ_METRICS: tuple[tuple[int, ...], ...] = (
+    (_AV, _PR, _UI),
+    (_AC, _AT),
+    (_VC, _VI, _VA, _CR, _IR, _AR),
+    (_SC, _SI, _SA),
+    (_E,),
+)
+
+
+def _max_vector_levels(max_vector: str) -> tuple[float, ...]:
+    values = dict(pair.split(":", 1) for pair in max_vector.split("/") if pair)
+    return tuple(_LEVELS[i].get(values.get(metric, "X"), 0.0) for i, metric in enumerate(_METRICS))
+
+
+def _build_macro_table() -> Mapping[str, tuple[float, tuple[tuple[float, ...], ...], tuple[int, ...]]]:
+    max_composed = _private("max_composed")
+    max_severity = _private("max_severity")
+    table = {}
+    for macro_vector, value in _private("cvss_lookup_global").items():
+        eq1, eq2, eq3, eq4, eq5, eq6 = (int(digit) for digit in macro_vector)
+        eq_maxes = (
+            max_composed["eq1"][eq1],
+            max_composed["eq2"][eq2],
+            max_composed["eq3eq6"][eq3][eq6],
+            max_composed["eq4"][eq4],
+            max_composed["eq5"][eq5],
+        )
+        # Same candidate order as CVSSv4.__get_max_vectors
+        candidates = tuple(_max_vector_levels("".join(combo)) for combo in product(*eq_maxes))
+        severities = (
+            max_severity["eq1"][eq1],
+            max_severity["eq2"][eq2],
+            max_severity["eq3eq6"][eq3][eq6],
+            max_severity["eq4"][eq4],
+            max_severity["eq5"][eq5],
+        )
+        table[macro_vector] = (value, candidates, severities)
+    return MappingProxyType(table)
+
+
+# Macro vector -> (lookup value, candidate max vectors as metric levels, max severity per EQ)
+_MACRO_TABLE = _build_macro_table()
+
+
+def _parse(vector: str) -> tuple[str, ...]:
+    # Returns the effective value of each metric in _METRICS, as CVSSv4.__get_metric_value does
+    if ":X" in vector:
+        vector = trim_cvss_vector(vector)
+    metrics: dict[str, str] = {}
+    for pair in vector.split("/"):
+        metric, sep, value = pair.partition(":")
+        if sep and value in _VALID.get(metric, ()):
+            metrics[metric] = value
+    get = metrics.get
+
+    def effective(metric: str) -> str:
+        modified = get("M" + metric, "X")
+        return modified if modified != "X" else get(metric, "X")
+
+    e = get("E", "X")
+    cr = get("CR", "X")
+    ir = get("IR", "X")
+    ar = get("AR", "X")
+    return (
+        effective("AV"), effective("PR"), effective("UI"), effective("AC"), effective("AT"),
+        effective("VC"), effective("VI"), effective("VA"), effective("SC"), effective("SI"), effective("SA"),
+        "H" if cr == "X" else cr, "H" if ir == "X" else ir, "H" if ar == "X" else ar,
+        "A" if e == "X" else e,
+    )
+
+
+def _macro_vector(state: tuple[str, ...]) -> str:
+    av, pr, ui = state[_AV], state[_PR], state[_UI]
+    if av == "N" and pr == "N" and ui == "N":
+        eq1 = "0"
+    elif (av == "N" or pr == "N" or ui == "N") and av != "P":
+        eq1 = "1"
+    else:
+        eq1 = "2"
+
+    eq2 = "0" if state[_AC] == "L" and state[_AT] == "N" else "1"
+
+    vc, vi, va = state[_VC], state[_VI], state[_VA]
+    if vc == "H" and vi == "H":
+        eq3 = "0"
+    elif vc == "H" or vi == "H" or va == "H":
+        eq3 = "1"
+    else:
+        eq3 = "2"
+
+    # MSI/MSA are the only way for SI/SA to be S, so this is the MSI == S or MSA == S test
+    si, sa = state[_SI], state[_SA]
+    if si == "S" or sa == "S":
+        eq4 = "0"
+    elif state[_SC] == "H" or si == "H" or sa == "H":
+        eq4 = "1"
+    else:
+        eq4 = "2"
+
+    e = state[_E]
+    eq5 = "0" if e == "A" else "1" if e == "P" else "2"
+
+    if (state[_CR] == "H" and vc == "H") or (state[_IR] == "H" and vi == "H") or (state[_AR] == "H" and va == "H"):
+        eq6 = "0"
+    else:
+        eq6 = "1"
+
+    return eq1 + eq2 + eq3 + eq4 + eq5 + eq6
+
+
+def _score(state: tuple[str, ...], macro_vector: str) -> float:
+    value, candidates, severities = _MACRO_TABLE[macro_vector]
+
+    # Exception for no impact on system (shortcut)
+    if (state[_VC] == "N" and state[_VI] == "N" and state[_VA] == "N"
+            and state[_SC] == "N" and state[_SI] == "N" and state[_SA] == "N"):
+        return 0.0
+
+    selected = tuple(levels.get(value_, 0.0) for levels, value_ in zip(_LEVELS, state))
+
+    # First max vector the selected vector is not more severe than, else the first one
+    chosen = candidates[0]
+    for candidate in candidates:
+        for have, limit in zip(selected, candidate):
+            if have < limit:
+                break
+        else:
+            chosen = candidate
+            break
+
+    total = 0
+    n_existing_lower = 0
+    for metrics, max_severity in zip(_EQ_METRICS, severities):
+        distance = 0
+        for i in metrics:
+            difference = chosen[i] - selected[i]
+            if difference > 0:
+                distance += difference
+        max_severity_eq = max_severity * 0.1
+        if max_severity and max_severity_eq > 0:
+            total += max_severity * (distance / max_severity_eq)
+            n_existing_lower += 1
+
+    mean_distance = total / n_existing_lower if n_existing_lower > 0 else 0
+    adjusted_score = value - mean_distance
+    if adjusted_score > value:
+        adjusted_score = value
+    if adjusted_score < 0:
+        adjusted_score = 0.0
+    if adjusted_score > 10:
+        adjusted_score = 10.0
+    return round(adjusted_score * 10) / 10.0
+
+
+# Effective values each metric can take after defaults and modified metrics are applied ('X' when absent)
+_EFFECTIVE_VALUES: tuple[tuple[str, ...], ...] = tuple(
+    ("H", "M", "L") if metric in ("CR", "IR", "AR")
+    else ("A", "P", "U") if metric == "E"
+    else tuple(_private("metric_levels")[metric]) + ("X",)
+    for metric in _METRICS
+)
+# Macro vector digits decided by each EQ in _EQ_METRICS (EQ3 and EQ6 share their metrics)
+_EQ_DIGITS: tuple[tuple[int, ...], ...] = ((0,), (1,), (2, 5), (3,), (4,))
+
+
+def _feasible_levels() -> tuple[dict[str, set[tuple[float, ...]]], ...]:
+    # For each EQ, the metric levels that can occur for each value of its macro vector digits
+    filler = tuple(values[0] for values in _EFFECTIVE_VALUES)
+    feasible: list[dict[str, set[tuple[float, ...]]]] = []
+    for metrics, digits in zip(_EQ_METRICS, _EQ_DIGITS):
+        by_digits: dict[str, set[tuple[float, ...]]] = {}
+        for values in product(*(_EFFECTIVE_VALUES[i] for i in metrics)):
+            state = list(filler)
+            for i, value in zip(metrics, values):
+                state[i] = value
+            macro_vector_ = _macro_vector(tuple(state))
+            by_digits.setdefault("".join(macro_vector_[d] for d in digits), set()).add(
+                tuple(_LEVELS[i].get(value, 0.0) for i, value in zip(metrics, values)))
+        feasible.append(by_digits)
+    return tuple(feasible)
+
+
+@cache
+def _band_table() -> Mapping[str, Optional[str]]:
+    # Macro vector -> severity band guaranteed by the macro vector alone, or None when its score range straddles
+    # a boundary. Built on first use, as only severity_only() and SeverityClassifier need it.
+    # The score is at most the lookup value. It is at least the lookup value minus the largest mean distance
+    # any vector of that macro vector could have, taking the worst candidate max vector for each EQ separately.
+    feasible = _feasible_levels()
+    # The worst distance of an EQ only depends on that EQ's digits, so it is shared across macro vectors
+    worst: dict[tuple[int, str], float] = {}
+    bands = {}
+    for macro_vector_, (value, candidates, severities) in _MACRO_TABLE.items():
+        total = 0.0
+        n_existing_lower = 0
+        for eq, (metrics, digits, max_severity) in enumerate(zip(_EQ_METRICS, _EQ_DIGITS, severities)):
+            key = (eq, "".join(macro_vector_[d] for d in digits))
+            if key not in worst:
+                maxima = {tuple(candidate[i] for i in metrics) for candidate in candidates}
+                worst[key] = max(
+                    sum(max(0.0, limit - level) for limit, level in zip(maximum, selected))
+                    for maximum in maxima for selected in feasible[eq][key[1]]
+                )
+            distance = worst[key]
+            if max_severity:
+                total += distance * 10
+                n_existing_lower += 1
+        lowest = value - (total / n_existing_lower if n_existing_lower else 0)
+        # No-impact vectors score 0.0 by shortcut; they can only have EQ3 = 2 and EQ4 = 2
+        if macro_vector_[2] == "2" and macro_vector_[3] == "2":
+            lowest = 0.0
+        # Keep a small margin so that floating point noise never decides the band
+        lowest = max(0.0, round((lowest - 1e-6) * 10) / 10.0)
+        highest = round(value * 10) / 10.0
+        low_band, high_band = severity_from_score(lowest), severity_from_score(highest)
+        bands[macro_vector_] = low_band if low_band == high_band else None
+    return MappingProxyType(bands)
+
+
+def macro_vector(vector: str) -> str:
+    """
+    Computes the macro vector of a CVSS 4.0 vector string, as CVSSv4.get_macro_vector() does.
+    """
+    return _macro_vector(_parse(vector))
+
+
+def score_vector(vector: str) -> float:
+    """
+    Scores a CVSS 4.0 vector string without building a CVSSv4 object.
+
+    The result is identical to CVSSv4(vector).get_score(). The function only reads immutable
+    module tables, so it is safe to call from any number of threads at once.
+
+    Args:
+        vector (str): The CVSS 4.0 vector string.
+
+    Returns:
+        float: The score, rounded to one decimal place.
+    """
+    state = _parse(vector)
+    return _score(state, _macro_vector(state))
+
+
+def score_and_macro_vector(vector: str) -> tuple[float, str]:
+    """
+    Returns both the score and the macro vector of a CVSS 4.0 vector string, parsing it only once.
+    """
+    state = _parse(vector)
+    macro_vector_ = _macro_vector(state)
+    return _score(state, macro_vector_), macro_vector_
+
+
+def severity_vector(vector: str) -> str:
+    """
+    Returns the severity band of a CVSS 4.0 vector string, identical to CVSSv4(vector).get_severity().
+    """
+    return severity_from_score(score_vector(vector))
+
+
+def severity_only(vector: str) -> str:
+    """
+    Returns the severity band of a CVSS 4.0 vector string, computing the exact score only when needed.
+
+    For most macro vectors every possible score falls in one band, which is then returned
+    directly. The result is always identical to CVSSv4(vector).get_severity().
+    """
+    state = _parse(vector)
+    macro_vector_ = _macro_vector(state)
+    band = _band_table()[macro_vector_]
+    if band is not None:
+        return band
+    return severity_from_score(_score(state, macro_vector_))
+
+
+class SeverityClassifier:
+    """
+    severity_only() with counters of how often the macro vector alone decided the band.
+
+    The counters are plain attributes; use one classifier per thread if exact counts matter.
+    """
+
+    def __init__(self) -> None:
+        self.shortcuts = 0
+        self.fallbacks = 0
+
+    def classify(self, vector: str) -> str:
+        state = _parse(vector)
+        macro_vector_ = _macro_vector(state)
+        band = _band_table()[macro_vector_]
+        if band is not None:
+            self.shortcuts += 1
+            return band
+        self.fallbacks += 1
+        return severity_from_score(_score(state, macro_vector_))
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.shortcuts + self.fallbacks
+        return self.shortcuts / total if total else 0.0
+
+
+def parse_state(vector: str) -> tuple[tuple[str, ...], str]:
+    """
+    Parses a CVSS 4.0 vector string into its effective metric values and macro vector.
+
+    The state is opaque to callers; it can be kept and passed to `with_exploit_maturity` or `score_state`.
+    """
+    state = _parse(vector)
+    return state, _macro_vector(state)
+
+
+def score_state(state: tuple[str, ...], macro_vector: str) -> float:
+    return _score(state, macro_vector)
+
+
+def with_exploit_maturity(state: tuple[str, ...], macro_vector: str, exploit_maturity: str) -> tuple[tuple[str, ...], str]:
+    """
+    Returns the state and macro vector of the same vector with a different Exploit Maturity (E) value.
+
+    Only EQ5 depends on E, so the other macro vector digits are reused as they are.
+
+    Args:
+        state (tuple[str, ...]): A state returned by `parse_state`.
+        macro_vector (str): Its macro vector.
+        exploit_maturity (str): The new E value: 'X', 'A', 'P' or 'U'.
+    """
+    if exploit_maturity not in _VALID["E"]:
+        raise ValueError(f"Invalid Exploit Maturity value: {exploit_maturity}")
+    e = "A" if exploit_maturity == "X" else exploit_maturity
+    eq5 = "0" if e == "A" else "1" if e == "P" else "2"
+    return state[:_E] + (e,) + state[_E + 1:], macro_vector[:4] + eq5 + macro_vector[5:]
+
+
+def score_many(vectors: Iterable[str]) -> list[float]:
+    return [score_vector(vector) for vector in vectors]
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from cvss import SEVERITIES, severity_from_score
+from cvss_fast import macro_vector, score_vector
+
+# pandas accessors for column-wise CVSS 4.0 scoring. pandas is only needed by this module;
+# importing it registers `Series.cvss4` and `DataFrame.cvss4`:
+#
+#     import cvss_pandas
+#     df["score"] = df.cvss4.score()            # uses the "vector" column
+#     df["severity"] = df.vector.cvss4.severity()
+#
+# The column is factorized first, so each distinct vector is scored once by cvss_fast no
+# matter how many rows repeat it. Missing values (None/NaN) give NaN scores and missing categories.
+
+
+@pd.api.extensions.register_series_accessor("cvss4")
+class CVSS4SeriesAccessor:
+
+    def __init__(self, series: pd.Series) -> None:
+        self.__series = series
+
+    def __factorize(self) -> tuple[np.ndarray, pd.Index]:
+        codes, uniques = pd.factorize(self.__series)
+        return codes, pd.Index(uniques)
+
+    def __categorical(self, codes: np.ndarray, unique_values: list[str], categories, ordered: bool) -> pd.Series:
+        positions = pd.Index(categories).get_indexer(unique_values)
+        # Code -1 (missing vector) maps to the trailing -1, i.e. a missing category
+        category_codes = np.append(positions, -1)[codes]
+        return pd.Series(pd.Categorical.from_codes(category_codes, categories=categories, ordered=ordered),
+                         index=self.__series.index, name=self.__series.name)
+
+    def score(self) -> pd.Series:
+        codes, uniques = self.__factorize()
+        scores = np.array([score_vector(vector) for vector in uniques] + [np.nan], dtype=float)
+        return pd.Series(scores[codes], index=self.__series.index, name=self.__series.name)
+
+    def severity(self) -> pd.Series:
+        codes, uniques = self.__factorize()
+        severities = [severity_from_score(score_vector(vector)) for vector in uniques]
+        return self.__categorical(codes, severities, list(SEVERITIES), ordered=True)
+
+    def macro_vector(self) -> pd.Series:
+        codes, uniques = self.__factorize()
+        macro_vectors = [macro_vector(vector) for vector in uniques]
+        return self.__categorical(codes, macro_vectors, sorted(set(macro_vectors)), ordered=False)
+
+
+@pd.api.extensions.register_dataframe_accessor("cvss4")
+class CVSS4DataFrameAccessor:
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.__df = df
+
+    def score(self, column: str = "vector") -> pd.Series:
+        return self.__df[column].cvss4.score()
+
+    def severity(self, column: str = "vector") -> pd.Series:
+        return self.__df[column].cvss4.severity()
+
+    def macro_vector(self, column: str = "vector") -> pd.Series:
+        return self.__df[column].cvss4.macro_vector()
@@ -0,0 +1,224 @@
+import argparse
+import os
+import random
+import sys
+import time
+from itertools import product
+from multiprocessing import Pool
+from typing import Callable, Iterator
+
+from batch import score_batch
+from cvss import BASE_METRICS, CVSSv4
+from cvss_fast import score_many, severity_only
+
+# Values that can be chosen for each metric, in the order of the CVSS 4.0 specification.
+# 'X' is included wherever it is valid so that "Not Defined" is exercised as well. The tables
+# come from the reference implementation, so the harness always covers exactly what it checks.
+ALL_METRIC_VALUES: dict[str, list[str]] = CVSSv4.metric_values()
+
+BASE_METRIC_VALUES: dict[str, list[str]] = {metric: ALL_METRIC_VALUES[metric] for metric in BASE_METRICS}
+
+SUPPLEMENTAL_METRIC_VALUES: dict[str, list[str]] = {
+    metric: ALL_METRIC_VALUES[metric] for metric in ("S", "AU", "R", "V", "RE", "U")
+}
+
+# Threat and environmental metrics
+OPTIONAL_METRIC_VALUES: dict[str, list[str]] = {
+    metric: values for metric, values in ALL_METRIC_VALUES.items()
+    if metric not in BASE_METRIC_VALUES and metric not in SUPPLEMENTAL_METRIC_VALUES
+}
+
+# Each EQ only depends on its own metrics, so the space can be stratified one EQ at a time.
+# The tuple holds the positions of the EQ in the macro vector; EQ3 and EQ6 share their metrics.
+EQ_GROUPS: dict[str, tuple[list[str], tuple[int, ...]]] = {
+    "eq1": (["AV", "PR", "UI", "MAV", "MPR", "MUI"], (0,)),
+    "eq2": (["AC", "AT", "MAC", "MAT"], (1,)),
+    "eq3eq6": (["VC", "VI", "VA", "CR", "IR", "AR", "MVC", "MVI", "MVA"], (2, 5)),
+    "eq4": (["SC", "SI", "SA", "MSC", "MSI", "MSA"], (3,)),
+    "eq5": (["E"], (4,)),
+}
+
+
+# An engine maps a list of vector strings to one result per vector.
+# "score" engines are compared with CVSSv4.get_score(), "severity" engines with CVSSv4.get_severity().
+Engine = Callable[[list[str]], list]
+ENGINES: dict[str, tuple[str, Engine]] = {}
+
+
+def register_engine(name: str, engine: Engine, kind: str = "score") -> None:
+    """
+    Registers an alternative scoring engine to be checked against the reference.
+
+    Args:
+        name (str): The name used in reports and on the command line.
+        engine (Engine): Takes a list of vector strings and returns one result per vector.
+        kind (str): "score" or "severity", selecting what the results are compared with.
+    """
+    if kind not in ("score", "severity"):
+        raise ValueError(f"Unknown engine kind: {kind}")
+    ENGINES[name] = (kind, engine)
+
+
+def _reference(vectors: list[str]) -> list[CVSSv4]:
+    return [CVSSv4(vector) for vector in vectors]
+
+
+register_engine("batch", lambda vectors: score_batch(vectors).scores())
+register_engine("fast", score_many)
+register_engine("severity_only", lambda vectors: [severity_only(vector) for vector in vectors], kind="severity")
+
+
+def enumerate_base_space(threat: bool = True) -> Iterator[str]:
+    """
+    Yields every base vector, optionally crossed with every Exploit Maturity value.
+
+    There are 104,976 base vectors, 419,904 with the threat metric.
+    """
+    metrics = dict(BASE_METRIC_VALUES)
+    if threat:
+        metrics["E"] = OPTIONAL_METRIC_VALUES["E"]
+    names = list(metrics)
+    for values in product(*metrics.values()):
+        yield "CVSS:4.0/" + "/".join(f"{name}:{value}" for name, value in zip(names, values))
+
+
+def random_vector(rng: random.Random) -> str:
+    return "CVSS:4.0/" + "/".join(f"{metric}:{rng.choice(values)}" for metric, values in ALL_METRIC_VALUES.items())
+
+
+def _group_levels(rng: random.Random, per_level: int, max_draws: int) -> dict[str, dict[str, list[dict[str, str]]]]:
+    # For each EQ group, collect random assignments of its metrics keyed by the macro vector digits they produce
+    filler = {metric: values[0] for metric, values in BASE_METRIC_VALUES.items()}
+    levels: dict[str, dict[str, list[dict[str, str]]]] = {}
+    for group, (metrics, positions) in EQ_GROUPS.items():
+        buckets: dict[str, list[dict[str, str]]] = {}
+        seen: set[tuple[str, ...]] = set()
+        for _ in range(max_draws):
+            assignment = {metric: rng.choice(ALL_METRIC_VALUES[metric]) for metric in metrics}
+            key = tuple(assignment.values())
+            if key in seen:
+                continue
+            seen.add(key)
+            vector = "CVSS:4.0/" + "/".join(f"{m}:{v}" for m, v in {**filler, **assignment}.items())
+            macro_vector = CVSSv4(vector).get_macro_vector()
+            bucket = buckets.setdefault("".join(macro_vector[i] for i in positions), [])
+            if len(bucket) < per_level:
+                bucket.append(assignment)
+        levels[group] = buckets
+    return levels
+
+
+def stratified_sample(per_key: int, seed: int = 0, max_draws: int = 20000) -> list[str]:
+    """
+    Draws `per_key` random vectors over the full metric space for every one of the 270 macro vectors.
+
+    Random metric assignments are first bucketed per EQ by the macro vector digits they produce,
+    then one assignment per EQ is combined to hit each macro vector directly. Supplemental metrics
+    are drawn at random as well, since they must not change the score.
+
+    Args:
+        per_key (int): Number of vectors wanted for each macro vector.
+        seed (int): Seed for the random generator, so that runs are reproducible.
+        max_draws (int): Number of random assignments drawn per EQ group.
+
+    Returns:
+        list[str]: The sampled vectors, grouped by macro vector.
+    """
+    rng = random.Random(seed)
+    levels = _group_levels(rng, per_key, max_draws)
+    vectors: list[str] = []
+    for eq1, eq2, eq3eq6, eq4, eq5 in product(*(sorted(levels[group]) for group in EQ_GROUPS)):
+        for _ in range(per_key):
+            metrics: dict[str, str] = {}
+            for group, digits in zip(EQ_GROUPS, (eq1, eq2, eq3eq6, eq4, eq5)):
+                metrics.update(rng.choice(levels[group][digits]))
+            for metric, values in SUPPLEMENTAL_METRIC_VALUES.items():
+                metrics[metric] = rng.choice(values)
+            # Keep the specification order so that vectors look like real ones
+            vectors.append("CVSS:4.0/" + "/".join(f"{m}:{metrics[m]}" for m in ALL_METRIC_VALUES))
+    return vectors
+
+
+def _check_chunk(args: tuple[list[str], list[str]]) -> dict[str, tuple[float, list[tuple[str, object, object]]]]:
+    vectors, engine_names = args
+    results: dict[str, tuple[float, list[tuple[str, object, object]]]] = {}
+
+    start = time.perf_counter()
+    reference = _reference(vectors)
+    results["reference"] = (time.perf_counter() - start, [])
+
+    for name in engine_names:
+        kind, engine = ENGINES[name]
+        start = time.perf_counter()
+        got = engine(vectors)
+        elapsed = time.perf_counter() - start
+        mismatches = []
+        for vector, expected_cvss, actual in zip(vectors, reference, got):
+            expected = expected_cvss.get_score() if kind == "score" else expected_cvss.get_severity()
+            if expected != actual:
+                mismatches.append((vector, expected, actual))
+        results[name] = (elapsed, mismatches)
+    return results
+
+
+def run(vectors: list[str], engine_names: list[str], workers: int, chunk_size: int = 2000) -> bool:
+    """
+    Compares every engine with the reference on `vectors` and prints a throughput report.
+
+    Returns:
+        bool: True if every engine agreed with the reference on every vector.
+    """
+    chunks = [(vectors[i:i + chunk_size], engine_names) for i in range(0, len(vectors), chunk_size)]
+    cpu_time: dict[str, float] = {name: 0.0 for name in ["reference"] + engine_names}
+    mismatches: dict[str, list[tuple[str, object, object]]] = {name: [] for name in engine_names}
+
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        for result in pool.imap_unordered(_check_chunk, chunks):
+            for name, (elapsed, chunk_mismatches) in result.items():
+                cpu_time[name] += elapsed
+                if chunk_mismatches:
+                    mismatches[name].extend(chunk_mismatches)
+    wall = time.perf_counter() - start
+
+    print(f"Checked {len(vectors)} vectors on {workers} workers in {wall:.1f}s")
+    print(f"{'Engine':<16}{'Vectors/s/core':>16}{'Speedup':>10}{'Mismatches':>12}")
+    reference_rate = len(vectors) / cpu_time["reference"] if cpu_time["reference"] else 0.0
+    for name, elapsed in cpu_time.items():
+        rate = len(vectors) / elapsed if elapsed else float("inf")
+        speedup = rate / reference_rate if reference_rate else 0.0
+        count = len(mismatches.get(name, []))
+        print(f"{name:<16}{rate:>16,.0f}{speedup:>9.1f}x{count:>12}")
+
+    ok = True
+    for name, found in mismatches.items():
+        for vector, expected, actual in found[:10]:
+            ok = False
+            print(f"MISMATCH {name}: {vector} expected {expected}, got {actual}")
+        if len(found) > 10:
+            print(f"... and {len(found) - 10} more mismatches for {name}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check alternative CVSS 4.0 engines against the reference CVSSv4 class.")
+    parser.add_argument("--mode", choices=["base", "sample"], default="base",
+                        help="base: every base vector x every E value; sample: stratified over all 270 macro vectors")
+    parser.add_argument("--per-key", type=int, default=50, help="Vectors per macro vector in sample mode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--engine", action="append", choices=sorted(ENGINES),
+                        help="Engine to check (repeatable, defaults to all)")
+    args = parser.parse_args()
+
+    if args.mode == "base":
+        vectors = list(enumerate_base_space())
+    else:
+        vectors = stratified_sample(args.per_key, args.seed)
+
+    ok = run(vectors, args.engine or sorted(ENGINES), args.workers)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
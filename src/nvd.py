@@ -1,40 +1,251 @@
-from typing import Optional
+import gzip
+import json
+import os
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Iterable, Iterator, Optional
 
 import requests
 
 from utils import trim_cvss_vector
 
 
+NVD_API_URL = "https://services.nvd.nist.gov/rest/json/cves/2.0?cveId="
+
+# Responses the NVD API uses for rate limiting and overload
+RETRY_STATUS_CODES = frozenset({403, 429, 503})
+
+
+def _extract_v40(vulnerability: dict[str, Any]) -> Optional[tuple[str, float, str]]:
+    metrics = vulnerability.get("cve", {}).get("metrics", {})
+    if not metrics.get("cvssMetricV40"):
+        return None
+    primary_metric = metrics["cvssMetricV40"][0].get("cvssData", {})
+    # An entry without a vector string carries no usable CVSS 4.0 data
+    if not primary_metric.get("vectorString"):
+        return None
+    vector_string = trim_cvss_vector(primary_metric["vectorString"])
+    base_score = primary_metric.get("baseScore")
+    return vector_string, base_score, "4.0"
+
+
+def iter_feed(paths: Iterable[str]) -> Iterator[tuple[str, Optional[tuple[str, float, str]]]]:
+    """
+    Iterates over local NVD 2.0 JSON feed files (plain or gzipped).
+
+    Args:
+        paths (Iterable[str]): Paths of feed files, each holding a "vulnerabilities" list like the CVE API.
+
+    Returns:
+        Iterator[tuple[str, Optional[tuple[str, float, str]]]]: The CVE ID of every entry, with the
+        (vector, base score, version) tuple returned by Nvd.get_cve, or None if it has no CVSS 4.0 data.
+    """
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        for vulnerability in data.get("vulnerabilities", []):
+            cve_id = vulnerability.get("cve", {}).get("id")
+            if cve_id:
+                yield cve_id, _extract_v40(vulnerability)
+
+
+def _cve_key(cve_id: str) -> int:
+    # CVE-YYYY-NNNN... packed into one integer; sequence numbers have at most 10 digits in practice
+    prefix, year, number = cve_id.strip().upper().split("-")
+    if prefix != "CVE":
+        raise ValueError(f"Invalid CVE ID: {cve_id}")
+    return int(year) * 10**10 + int(number)
+
+
+class CveIdFilter:
+    """
+    Compact set of CVE IDs that carry CVSS 4.0 data, used to skip API calls that cannot succeed.
+
+    IDs are stored as a sorted array of 64-bit integers (8 bytes per ID) and looked up by binary
+    search. Unlike a Bloom filter there are no false positives.
+    """
+
+    def __init__(self, cve_ids: Iterable[str] = ()) -> None:
+        self.__keys = array("q", sorted({_cve_key(cve_id) for cve_id in cve_ids}))
+
+    def __contains__(self, cve_id: object) -> bool:
+        if not isinstance(cve_id, str):
+            return False
+        try:
+            key = _cve_key(cve_id)
+        except ValueError:
+            return False
+        index = bisect_left(self.__keys, key)
+        return index < len(self.__keys) and self.__keys[index] == key
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    @classmethod
+    def from_feed(cls, paths: Iterable[str]) -> "CveIdFilter":
+        return cls(cve_id for cve_id, result in iter_feed(paths) if result is not None)
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            self.__keys.tofile(f)
+
+    @classmethod
+    def load(cls, path: str) -> "CveIdFilter":
+        cve_filter = cls()
+        with open(path, "rb") as f:
+            cve_filter.__keys.fromfile(f, os.path.getsize(path) // cve_filter.__keys.itemsize)
+        return cve_filter
+
+
 class Nvd:
 
-    def __init__(self) -> None:
-        self.__api_url = "https://services.nvd.nist.gov/rest/json/cves/2.0?cveId="
+    def __init__(self, cache_file: Optional[str] = None, ttl: float = 86400, negative_ttl: float = 3600,
+                 known_v40: Optional[CveIdFilter] = None, api_url: str = NVD_API_URL, timeout: float = 30,
+                 retries: int = 0, backoff: float = 1.0, quiet: bool = False,
+                 max_entries: Optional[int] = None) -> None:
+        """
+        Args:
+            cache_file (Optional[str]): JSON file to persist lookups across runs. Written by save_cache().
+            ttl (float): Seconds a CVSS 4.0 result stays cached.
+            negative_ttl (float): Seconds a "no CVSS 4.0 data" result stays cached.
+            known_v40 (Optional[CveIdFilter]): CVE IDs known to have CVSS 4.0 data. Other IDs are answered
+                with None without any I/O.
+            api_url (str): CVE API endpoint, up to and including "cveId=".
+            timeout (float): Seconds to wait for each HTTP request.
+            retries (int): Extra attempts after rate limiting (403, 429, 503), timeouts and broken responses.
+            backoff (float): Base delay in seconds between attempts, doubled after each one. A Retry-After
+                header takes precedence.
+            quiet (bool): Do not report lookups on stdout, e.g. when fetching in the background.
+            max_entries (Optional[int]): Most lookups kept in memory; the oldest are dropped first.
+                Unbounded by default. Set it when looking up an unbounded stream of CVE IDs.
+        """
+        self.__max_entries = max_entries
+        self.__quiet = quiet
+        self.__api_url = api_url
+        self.__timeout = timeout
+        self.__retries = retries
+        self.__backoff = backoff
+        self.__session = requests.Session()
+        # Counters for monitoring and load tests
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.__cache_file = cache_file
+        self.__ttl = ttl
+        self.__negative_ttl = negative_ttl
+        self.__known_v40 = known_v40
+        # cve_id -> (time fetched, result or None)
+        self.__cache: dict[str, tuple[float, Optional[tuple[str, float, str]]]] = {}
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file, "r", encoding="utf-8") as f:
+                self.__cache = {
+                    cve_id: (fetched, tuple(result) if result else None)  # type: ignore[misc]
+                    for cve_id, (fetched, result) in json.load(f).items()
+                }
+
+    def __enter__(self) -> "Nvd":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.save_cache()
+
+    def save_cache(self) -> None:
+        if not self.__cache_file:
+            return
+        tmp_file = self.__cache_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.__cache, f)
+        os.replace(tmp_file, self.__cache_file)
+
+    def __cached(self, cve_id: str) -> tuple[bool, Optional[tuple[str, float, str]]]:
+        entry = self.__cache.get(cve_id)
+        if entry is None:
+            return False, None
+        fetched, result = entry
+        ttl = self.__ttl if result is not None else self.__negative_ttl
+        if time.time() - fetched > ttl:
+            del self.__cache[cve_id]
+            return False, None
+        return True, result
+
+    def __store(self, cve_id: str, result: Optional[tuple[str, float, str]]) -> None:
+        self.__cache.pop(cve_id, None)
+        self.__cache[cve_id] = (time.time(), result)
+        if self.__max_entries is not None:
+            # Dicts keep insertion order, so the first key is the oldest lookup
+            while len(self.__cache) > self.__max_entries:
+                del self.__cache[next(iter(self.__cache))]
+
+    def __retry_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return float(retry_after)
+        return self.__backoff * 2 ** attempt
+
+    def __fetch(self, url: str) -> dict[str, Any]:
+        attempt = 0
+        while True:
+            last_attempt = attempt >= self.__retries
+            self.requests += 1
+            try:
+                response = self.__session.get(url, timeout=self.__timeout)
+                if response.status_code in RETRY_STATUS_CODES and not last_attempt:
+                    self.retries += 1
+                    time.sleep(self.__retry_delay(attempt, response))
+                    attempt += 1
+                    continue
+                response.raise_for_status()
+                return response.json()
+            except requests.HTTPError:
+                raise
+            except requests.RequestException:
+                # Timeouts, dropped connections and truncated bodies
+                if last_attempt:
+                    raise
+                self.retries += 1
+                time.sleep(self.__retry_delay(attempt))
+            attempt += 1
+
+    def __report(self, message: str) -> None:
+        if not self.__quiet:
+            print(message)
 
     def get_cve(self, cve_id) -> Optional[tuple[str, float, str]]:
+        if self.__known_v40 is not None and cve_id not in self.__known_v40:
+            self.__report(f"No CVSS 4.0 vector available for {cve_id}.")
+            return None
+
+        hit, result = self.__cached(cve_id)
+        if hit:
+            if result is None:
+                self.__report(f"No CVSS 4.0 vector available for {cve_id} (cached).")
+            return result
+
         url = self.__api_url + cve_id
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            data = self.__fetch(url)
 
             vulnerabilities = data.get("vulnerabilities", [])
             if not vulnerabilities:
-                print(f"No vulnerabilities found for {cve_id}.")
+                self.__report(f"No vulnerabilities found for {cve_id}.")
+                self.__store(cve_id, None)
                 return None
 
-            metrics = vulnerabilities[0].get("cve", {}).get("metrics", {})
-            if "cvssMetricV40" in metrics:
-                primary_metric = metrics["cvssMetricV40"][0]["cvssData"]
-                vector_string = trim_cvss_vector(primary_metric.get(
-                    "vectorString"))
-                base_score = primary_metric.get("baseScore")
-                print(
+            result = _extract_v40(vulnerabilities[0])
+            self.__store(cve_id, result)
+            if result is not None:
+                vector_string, base_score, _ = result
+                self.__report(
                     f"CVSS 4.0 Base Vector: {vector_string} | Base Score: {base_score}")
-                return vector_string, base_score, "4.0"
+                return result
             else:
-                print(f"No CVSS 4.0 vector available for {cve_id}.")
+                self.__report(f"No CVSS 4.0 vector available for {cve_id}.")
                 return None
 
         except requests.RequestException as e:
-            print(f"Error fetching CVSS data: {e}")
+            self.errors += 1
+            self.__report(f"Error fetching CVSS data: {e}")
             return None
@@ -0,0 +1,106 @@
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Iterator
+
+from nvd import Nvd
+from nvd_sim import add_fault_arguments, faults_from_arguments, load_fixtures, start, synthetic_fixtures
+
+# Load-test driver for the Nvd client.
+#
+#     python nvd_loadtest.py --synthetic 2000 --concurrency 1 4 16 --retries 0 3 --rate-limit 0.1
+#
+# runs the same request mix for every combination of client settings against a simulated
+# NVD server (or a running one with --url) and prints throughput, latency percentiles,
+# retry counts and error rates.
+
+
+def _worker(api_url: str, cve_ids: list[str], timeout: float, retries: int, backoff: float) -> tuple[list[float], int, int, int]:
+    # One client per thread: requests.Session is not meant to be shared between threads
+    nvd = Nvd(ttl=0, negative_ttl=0, api_url=api_url, timeout=timeout, retries=retries, backoff=backoff,
+              quiet=True)
+    latencies: list[float] = []
+    found = 0
+    for cve_id in cve_ids:
+        start_time = time.perf_counter()
+        if nvd.get_cve(cve_id) is not None:
+            found += 1
+        latencies.append(time.perf_counter() - start_time)
+    return latencies, found, nvd.retries, nvd.errors
+
+
+def _split(items: list[str], parts: int) -> Iterator[list[str]]:
+    iterator = iter(items)
+    size = -(-len(items) // parts)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def run(api_url: str, cve_ids: list[str], concurrency: int, timeout: float, retries: int, backoff: float) -> dict[str, float]:
+    """
+    Looks up every CVE ID once, spread over `concurrency` threads, and returns the measurements.
+    """
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(lambda chunk: _worker(api_url, chunk, timeout, retries, backoff),
+                                    _split(cve_ids, concurrency)))
+    elapsed = time.perf_counter() - start_time
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": percentiles[49],
+        "p90": percentiles[89],
+        "p99": percentiles[98],
+        "found": sum(result[1] for result in results),
+        "retries": sum(result[2] for result in results),
+        "error_rate": sum(result[3] for result in results) / len(latencies) if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the Nvd client against a simulated NVD server.")
+    parser.add_argument("--url", help="API URL of an already running server, up to and including 'cveId='")
+    parser.add_argument("--feed", nargs="*", default=[], help="NVD 2.0 JSON feed files to serve")
+    parser.add_argument("--synthetic", type=int, default=1000, help="Number of synthetic CVE records to serve")
+    parser.add_argument("--requests", type=int, help="Lookups per run (defaults to every fixture once)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--timeout", type=float, nargs="+", default=[30.0])
+    parser.add_argument("--retries", type=int, nargs="+", default=[0, 3])
+    parser.add_argument("--backoff", type=float, default=0.1)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.feed)
+    fixtures.update(synthetic_fixtures(args.synthetic, seed=args.seed))
+    cve_ids = sorted(fixtures)
+    if args.requests:
+        cve_ids = (cve_ids * (args.requests // max(1, len(cve_ids)) + 1))[:args.requests]
+
+    server = None
+    api_url = args.url
+    if api_url is None:
+        server = start(fixtures, faults_from_arguments(args))
+        api_url = server.api_url
+
+    print(f"{len(cve_ids)} lookups per run against {api_url}")
+    print(f"{'Threads':>8}{'Timeout':>9}{'Retries':>8}{'Req/s':>10}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"
+          f"{'Retried':>9}{'Errors':>8}{'Found':>7}")
+    try:
+        for concurrency in args.concurrency:
+            for timeout in args.timeout:
+                for retries in args.retries:
+                    result = run(api_url, cve_ids, concurrency, timeout, retries, args.backoff)
+                    print(f"{concurrency:>8}{timeout:>9.1f}{retries:>8}{result['throughput']:>10.1f}"
+                          f"{result['p50'] * 1000:>9.1f}{result['p90'] * 1000:>9.1f}{result['p99'] * 1000:>9.1f}"
+                          f"{result['retries']:>9.0f}{result['error_rate']:>8.1%}{result['found']:>7.0f}")
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
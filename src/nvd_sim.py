@@ -0,0 +1,201 @@
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterable, Optional
+from urllib.parse import parse_qs, urlparse
+
+from cvss_fast import score_vector
+from differential import random_vector
+
+# Local stand-in for the NVD CVE API 2.0, for load tests of the Nvd client.
+#
+#     python nvd_sim.py --synthetic 10000 --latency 0.05 --rate-limit 0.05 --truncate 0.01
+#
+# serves GET /rest/json/cves/2.0?cveId=<id> with the same response shape as the real API,
+# from NVD feed files or from synthetic CVE records, and injects faults at the given rates.
+
+
+class Faults:
+    """
+    Fault injection settings. Rates are probabilities per request, between 0 and 1.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, forbidden: float = 0.0,
+                 rate_limit: float = 0.0, unavailable: float = 0.0, truncate: float = 0.0,
+                 retry_after: Optional[int] = None, seed: Optional[int] = None) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.forbidden = forbidden
+        self.rate_limit = rate_limit
+        self.unavailable = unavailable
+        self.truncate = truncate
+        self.retry_after = retry_after
+        self.__rng = random.Random(seed)
+        self.__lock = threading.Lock()
+
+    def draw(self) -> tuple[float, Optional[int], bool]:
+        """
+        Returns the delay, the error status to send (or None) and whether to truncate the body.
+        """
+        with self.__lock:
+            delay = max(0.0, self.latency + self.__rng.uniform(-self.jitter, self.jitter))
+            roll = self.__rng.random()
+            truncate = self.__rng.random() < self.truncate
+        status = None
+        for code, rate in ((403, self.forbidden), (429, self.rate_limit), (503, self.unavailable)):
+            if roll < rate:
+                status = code
+                break
+            roll -= rate
+        return delay, status, truncate
+
+
+def load_fixtures(paths: Iterable[str]) -> dict[str, dict[str, Any]]:
+    """
+    Loads NVD 2.0 feed files or saved API responses into a CVE ID -> vulnerability entry mapping.
+    """
+    fixtures: dict[str, dict[str, Any]] = {}
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for vulnerability in json.load(f).get("vulnerabilities", []):
+                fixtures[vulnerability["cve"]["id"]] = vulnerability
+    return fixtures
+
+
+def synthetic_fixtures(count: int, v40_ratio: float = 0.3, seed: int = 0) -> dict[str, dict[str, Any]]:
+    """
+    Generates `count` CVE records, CVE-2024-100000 onwards, a fraction of which carry CVSS 4.0 metrics.
+    """
+    rng = random.Random(seed)
+    fixtures: dict[str, dict[str, Any]] = {}
+    for i in range(count):
+        cve_id = f"CVE-2024-{100000 + i}"
+        metrics: dict[str, Any] = {}
+        if rng.random() < v40_ratio:
+            vector = random_vector(rng)
+            metrics["cvssMetricV40"] = [{
+                "source": "nvd@nist.gov",
+                "type": "Primary",
+                "cvssData": {"version": "4.0", "vectorString": vector, "baseScore": score_vector(vector)},
+            }]
+        fixtures[cve_id] = {"cve": {"id": cve_id, "metrics": metrics}}
+    return fixtures
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "NvdSimServer"
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs add ~40 ms per response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        delay, status, truncate = self.server.faults.draw()
+        if delay:
+            time.sleep(delay)
+        if status is not None:
+            body = json.dumps({"message": "Simulated rate limit"}).encode("utf-8")
+            self.send_response(status)
+            if self.server.faults.retry_after is not None:
+                self.send_header("Retry-After", str(self.server.faults.retry_after))
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        url = urlparse(self.path)
+        if url.path != "/rest/json/cves/2.0":
+            self.send_error(404)
+            return
+        cve_id = parse_qs(url.query).get("cveId", [""])[0]
+        vulnerability = self.server.fixtures.get(cve_id)
+        vulnerabilities = [vulnerability] if vulnerability else []
+        body = json.dumps({
+            "resultsPerPage": len(vulnerabilities),
+            "startIndex": 0,
+            "totalResults": len(vulnerabilities),
+            "format": "NVD_CVE",
+            "version": "2.0",
+            "vulnerabilities": vulnerabilities,
+        }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if truncate:
+            # Announce the full length but stop half way and drop the connection
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+class NvdSimServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], fixtures: dict[str, dict[str, Any]], faults: Faults) -> None:
+        super().__init__(address, _Handler)
+        self.fixtures = fixtures
+        self.faults = faults
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/rest/json/cves/2.0?cveId="
+
+
+def start(fixtures: dict[str, dict[str, Any]], faults: Faults, host: str = "127.0.0.1", port: int = 0) -> NvdSimServer:
+    """
+    Starts a simulated NVD server in a background thread. Port 0 picks a free port; see `api_url`.
+    """
+    server = NvdSimServer((host, port), fixtures, faults)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- seconds around --latency")
+    parser.add_argument("--forbidden", type=float, default=0.0, help="Rate of 403 responses")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Rate of 429 responses")
+    parser.add_argument("--unavailable", type=float, default=0.0, help="Rate of 503 responses")
+    parser.add_argument("--truncate", type=float, default=0.0, help="Rate of truncated bodies")
+    parser.add_argument("--retry-after", type=int, help="Retry-After seconds sent with error responses")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def faults_from_arguments(args: argparse.Namespace) -> Faults:
+    return Faults(args.latency, args.jitter, args.forbidden, args.rate_limit, args.unavailable,
+                  args.truncate, args.retry_after, args.seed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulated NVD CVE API 2.0 server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--feed", nargs="*", default=[], help="NVD 2.0 JSON feed files to serve")
+    parser.add_argument("--synthetic", type=int, default=0, help="Number of synthetic CVE records to serve")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.feed)
+    fixtures.update(synthetic_fixtures(args.synthetic, seed=args.seed))
+    server = NvdSimServer((args.host, args.port), fixtures, faults_from_arguments(args))
+    print(f"Serving {len(fixtures)} CVE records at {server.api_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+import argparse
+import csv
+import json
+import math
+import os
+import struct
+import zlib
+from functools import lru_cache
+from typing import Any, BinaryIO, Iterator, Optional
+
+from cvss import CVSSv4, severity_from_score
+from cvss_calc import apply_answers, questions
+from cvss_fast import score_vector
+
+# Out-of-core tailored scoring of findings joined with per-asset environmental profiles.
+#
+#     python outofcore.py findings.csv assets.csv --out scores.csv --work-dir job --memory 1024
+#
+# findings.csv has the columns finding_id,asset_id,vector and assets.csv the columns
+# asset_id,profile, where a profile lists the answers to the cvss_calc questions,
+# e.g. "CR:H/IR:M/MAV:L". The output has the columns finding_id,asset_id,score,severity.
+# Findings whose vector is not a valid CVSS 4.0 vector are written, with the reason, to
+# scores.rejected.csv instead (see rejected_path).
+#
+# The job runs in four passes over files in the work directory:
+#
+#   1. assets are spilled to partitions by asset ID, with their normalized profile;
+#   2. findings are spilled to partitions by asset ID;
+#   3. each pair of partitions is joined in memory (only one asset partition is loaded at a time)
+#      and the (finding, vector, profile) records are spilled again, partitioned by base vector.
+#      Profiles travel with the records, so no table of distinct profiles is ever held in memory;
+#   4. each vector partition is scored through one (vector, profile) cache shared by all
+#      partitions. Findings of the same base vector land in the same partition, so the cache
+#      stays hot however large the job is.
+#
+# Partitions hold length-prefixed binary records (see _write_record). A manifest records the
+# finished passes and the join checkpoint, and every scored partition is renamed into place
+# when complete, so an interrupted job resumes where it stopped when run again.
+#
+# A profile only overrides the metrics it sets; the finding's own values (including its Exploit
+# Maturity, which profiles may not set) are kept for the others. Findings whose asset has no
+# profile are scored with their vector as is.
+
+MANIFEST = "manifest.json"
+# Layout of the partition files, recorded in the manifest so that a job never resumes on another one
+_FORMAT = 2
+
+# Record header: the body length. The body is the NUL-separated UTF-8 string fields.
+_HEADER = struct.Struct("<I")
+_READ_SIZE = 1 << 20
+# Rough in-memory costs, used to turn the memory budget into partition and cache sizes
+_ASSET_BYTES_PER_FILE_BYTE = 6
+_CACHE_ENTRY_BYTES = 400
+_MAX_PARTITIONS = 1024
+
+
+def _partition(key: str, partitions: int) -> int:
+    # crc32 rather than hash(): string hashes change between runs, and resuming needs the same layout
+    return zlib.crc32(key.encode("utf-8")) % partitions
+
+
+def _write_record(f: BinaryIO, *fields: str) -> None:
+    body = "\0".join(fields).encode("utf-8")
+    f.write(_HEADER.pack(len(body)))
+    f.write(body)
+
+
+def _read_records(path: str) -> Iterator[list[str]]:
+    """
+    Yields the string fields of every record of a partition file, reading it in chunks.
+    """
+    with open(path, "rb") as f:
+        tail = b""
+        while chunk := f.read(_READ_SIZE):
+            data = tail + chunk
+            position = 0
+            while position + _HEADER.size <= len(data):
+                (length,) = _HEADER.unpack_from(data, position)
+                end = position + _HEADER.size + length
+                if end > len(data):
+                    break
+                yield data[position + _HEADER.size:end].decode("utf-8").split("\0")
+                position = end
+            tail = data[position:]
+        if tail:
+            raise ValueError(f"Truncated partition file: {path}")
+
+
+def parse_profile(profile: str) -> dict[str, str]:
+    """
+    Parses an environmental profile such as "CR:H/IR:M/MAV:L" into answers for apply_answers.
+
+    Exploit Maturity (E) describes the vulnerability rather than the asset, so it is rejected.
+    """
+    answers: dict[str, str] = {}
+    for item in filter(None, profile.strip().split("/")):
+        metric, _, value = item.partition(":")
+        if metric == "E":
+            raise ValueError(f"Exploit Maturity is not an asset property: {item}")
+        if metric not in questions or value not in questions[metric]["options"]:
+            raise ValueError(f"Invalid profile metric: {item}")
+        answers[metric] = value
+    return answers
+
+
+@lru_cache(maxsize=1 << 12)
+def _normalize_profile(profile: str) -> str:
+    # Validates a profile and writes it in question order, so equal profiles share score cache entries
+    answers = parse_profile(profile)
+    return "/".join(f"{metric}:{answers[metric]}" for metric in questions if metric in answers)
+
+
+class _Partitions:
+    """
+    A set of partition files written side by side.
+    """
+
+    def __init__(self, directory: str, prefix: str, partitions: int, buffer_size: int,
+                 offsets: Optional[list[int]] = None) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.paths = [os.path.join(directory, f"{prefix}-{i:04d}.bin") for i in range(partitions)]
+        self.files: list[BinaryIO] = []
+        for i, path in enumerate(self.paths):
+            if offsets is None:
+                f = open(path, "wb", buffering=buffer_size)
+            else:
+                # Resuming: drop whatever was written after the last checkpoint
+                f = open(path, "r+b", buffering=buffer_size)
+                f.truncate(offsets[i])
+                f.seek(offsets[i])
+            self.files.append(f)
+
+    def write(self, key: str, *fields: str) -> None:
+        _write_record(self.files[_partition(key, len(self.files))], *fields)
+
+    def flush(self) -> list[int]:
+        for f in self.files:
+            f.flush()
+            os.fsync(f.fileno())
+        return [f.tell() for f in self.files]
+
+    def close(self) -> None:
+        for f in self.files:
+            f.close()
+
+
+class OutOfCoreJob:
+    """
+    Tailored scoring of a findings file joined with an asset profiles file, within a memory budget.
+
+    The budget is approximate: it sets the number of partitions, so that one asset partition fits
+    in half of it, and the size of the score cache, which gets the other half.
+    """
+
+    def __init__(self, findings: str, assets: str, work_dir: str, memory: int = 512 << 20,
+                 partitions: Optional[int] = None) -> None:
+        """
+        Args:
+            findings (str): CSV file with the columns finding_id, asset_id and vector.
+            assets (str): CSV file with the columns asset_id and profile.
+            work_dir (str): Directory for the partitions and the manifest. Running the job again with
+                the same directory resumes it.
+            memory (int): Memory budget in bytes.
+            partitions (Optional[int]): Number of partitions. Derived from the budget and the size of
+                the assets file by default.
+        """
+        self.findings = findings
+        self.assets = assets
+        self.work_dir = work_dir
+        if partitions is None:
+            asset_bytes = os.path.getsize(assets) * _ASSET_BYTES_PER_FILE_BYTE
+            partitions = min(_MAX_PARTITIONS, max(1, math.ceil(asset_bytes / (memory / 2))))
+        self.partitions = partitions
+        self.cache_size = max(1, memory // 2 // _CACHE_ENTRY_BYTES)
+        # Write buffers of all the open partitions take at most an eighth of the budget
+        self.buffer_size = max(1 << 12, min(1 << 20, memory // 8 // partitions))
+        self.__manifest_path = os.path.join(work_dir, MANIFEST)
+        self.__manifest = self.__load_manifest()
+
+    def __inputs(self) -> dict[str, Any]:
+        # A job only resumes on the very same inputs and layout
+        return {
+            "findings": [os.path.abspath(self.findings), os.path.getsize(self.findings), os.path.getmtime(self.findings)],
+            "assets": [os.path.abspath(self.assets), os.path.getsize(self.assets), os.path.getmtime(self.assets)],
+            "partitions": self.partitions,
+            "format": _FORMAT,
+        }
+
+    def __load_manifest(self) -> dict[str, Any]:
+        inputs = self.__inputs()
+        if os.path.exists(self.__manifest_path):
+            with open(self.__manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest["inputs"] != inputs:
+                raise ValueError(f"{self.work_dir} holds a job for other inputs, partitions or file format; use another work directory")
+            return manifest
+        os.makedirs(self.work_dir, exist_ok=True)
+        manifest = {"inputs": inputs, "done": [], "joined": 0, "offsets": None, "counts": {}}
+        self.__save_manifest(manifest)
+        return manifest
+
+    def __save_manifest(self, manifest: Optional[dict[str, Any]] = None) -> None:
+        tmp_path = self.__manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest or self.__manifest, f)
+        os.replace(tmp_path, self.__manifest_path)
+
+    def __finish(self, step: str, **counts: int) -> None:
+        self.__manifest["done"].append(step)
+        self.__manifest["counts"].update(counts)
+        self.__save_manifest()
+
+    def __path(self, *parts: str) -> str:
+        return os.path.join(self.work_dir, *parts)
+
+    def __spill_assets(self) -> None:
+        spilled = _Partitions(self.__path("assets"), "assets", self.partitions, self.buffer_size)
+        count = 0
+        try:
+            with open(self.assets, "r", encoding="utf-8", newline="") as f:
+                reader = csv.reader(f)
+                header = next(reader)
+                asset_column, profile_column = header.index("asset_id"), header.index("profile")
+                for row in reader:
+                    spilled.write(row[asset_column], row[asset_column], _normalize_profile(row[profile_column]))
+                    count += 1
+            spilled.flush()
+        finally:
+            spilled.close()
+        self.__finish("assets", assets=count)
+
+    def __spill_findings(self) -> None:
+        spilled = _Partitions(self.__path("findings"), "findings", self.partitions, self.buffer_size)
+        count = 0
+        try:
+            with open(self.findings, "r", encoding="utf-8", newline="") as f:
+                reader = csv.reader(f)
+                header = next(reader)
+                columns = [header.index(name) for name in ("finding_id", "asset_id", "vector")]
+                for row in reader:
+                    finding_id, asset_id, vector = (row[i] for i in columns)
+                    spilled.write(asset_id, finding_id, asset_id, vector)
+                    count += 1
+            spilled.flush()
+        finally:
+            spilled.close()
+        self.__finish("findings", findings=count)
+
+    def __join(self) -> None:
+        # Checkpointed after every partition: the vector partitions are truncated back to the
+        # offsets of the last checkpoint and the join goes on from the next partition
+        start = self.__manifest["joined"]
+        spilled = _Partitions(self.__path("joined"), "joined", self.partitions, self.buffer_size,
+                              self.__manifest["offsets"] if start else None)
+        unmatched = self.__manifest["counts"].get("unmatched", 0)
+        try:
+            for i in range(start, self.partitions):
+                asset_profiles = dict(_read_records(self.__path("assets", f"assets-{i:04d}.bin")))
+                for finding_id, asset_id, vector in _read_records(self.__path("findings", f"findings-{i:04d}.bin")):
+                    profile = asset_profiles.get(asset_id)
+                    if profile is None:
+                        # Scored with the vector as is, which is what an empty profile does
+                        unmatched += 1
+                        profile = ""
+                    spilled.write(vector, finding_id, asset_id, vector, profile)
+                del asset_profiles
+                self.__manifest["offsets"] = spilled.flush()
+                self.__manifest["joined"] = i + 1
+                self.__manifest["counts"]["unmatched"] = unmatched
+                self.__save_manifest()
+        finally:
+            spilled.close()
+        self.__finish("join")
+
+    def __score(self) -> tuple[int, Any]:
+        @lru_cache(maxsize=self.cache_size)
+        def score(vector: str, profile: str) -> tuple[Optional[float], str]:
+            # (score, severity), or (None, reason) for an invalid vector
+            try:
+                canonical = CVSSv4.validate(vector)
+            except ValueError as e:
+                return None, str(e)
+            answers = parse_profile(profile)
+            tailored_score = score_vector(apply_answers(canonical, answers, answers.keys()))
+            return tailored_score, severity_from_score(tailored_score)
+
+        os.makedirs(self.__path("scored"), exist_ok=True)
+        scored = 0
+        for i in range(self.partitions):
+            path = self.__path("scored", f"scored-{i:04d}.csv")
+            rejected_path = self.__path("scored", f"rejected-{i:04d}.csv")
+            if os.path.exists(path):
+                continue
+            with open(path + ".tmp", "w", encoding="utf-8", newline="") as out, \
+                    open(rejected_path + ".tmp", "w", encoding="utf-8", newline="") as rejected:
+                writer, rejected_writer = csv.writer(out), csv.writer(rejected)
+                for finding_id, asset_id, vector, profile in _read_records(self.__path("joined", f"joined-{i:04d}.bin")):
+                    tailored_score, severity = score(vector, profile)
+                    if tailored_score is None:
+                        rejected_writer.writerow((finding_id, asset_id, vector, severity))
+                    else:
+                        writer.writerow((finding_id, asset_id, tailored_score, severity))
+                        scored += 1
+            # The scored file goes last: its presence marks the partition as done
+            os.replace(rejected_path + ".tmp", rejected_path)
+            os.replace(path + ".tmp", path)
+        return scored, score.cache_info()
+
+    def __concatenate(self, output: str, header: str, prefix: str) -> int:
+        lines = 0
+        with open(output + ".tmp", "w", encoding="utf-8", newline="") as out:
+            out.write(header + "\r\n")
+            for i in range(self.partitions):
+                with open(self.__path("scored", f"{prefix}-{i:04d}.csv"), "r", encoding="utf-8", newline="") as f:
+                    while chunk := f.read(_READ_SIZE):
+                        out.write(chunk)
+                        lines += chunk.count("\n")
+        os.replace(output + ".tmp", output)
+        return lines
+
+    def __merge(self, output: str) -> None:
+        rejected = self.__concatenate(rejected_path(output), "finding_id,asset_id,vector,reason", "rejected")
+        self.__concatenate(output, "finding_id,asset_id,score,severity", "scored")
+        self.__finish("merge", rejected=rejected)
+
+    def run(self, output: str) -> dict[str, Any]:
+        """
+        Runs the remaining passes and writes the scores to `output`, grouped by base vector rather
+        than in input order. Findings with an invalid vector go to `rejected_path(output)`.
+
+        Returns:
+            dict[str, Any]: Counts of the whole job, plus the findings scored and cache statistics of this run.
+        """
+        done = self.__manifest["done"]
+        if "assets" not in done:
+            self.__spill_assets()
+        if "findings" not in done:
+            self.__spill_findings()
+        if "join" not in done:
+            self.__join()
+        scored, cache_info = 0, None
+        if "merge" not in done:
+            scored, cache_info = self.__score()
+            self.__merge(output)
+        summary: dict[str, Any] = dict(self.__manifest["counts"])
+        summary["scored_this_run"] = scored
+        if cache_info is not None:
+            summary["cache_hits"] = cache_info.hits
+            summary["cache_misses"] = cache_info.misses
+        return summary
+
+    def cleanup(self) -> None:
+        """
+        Removes the partition files once the output is written. The manifest stays, so that
+        running the job again does not redo it.
+        """
+        for directory in ("assets", "findings", "joined", "scored"):
+            path = self.__path(directory)
+            if os.path.isdir(path):
+                for name in os.listdir(path):
+                    os.remove(os.path.join(path, name))
+                os.rmdir(path)
+
+
+def rejected_path(output: str) -> str:
+    """
+    Returns the path of the rejected findings file that goes with an output file, e.g. scores.rejected.csv.
+    """
+    root, extension = os.path.splitext(output)
+    return f"{root}.rejected{extension or '.csv'}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tailored CVSS 4.0 scoring of findings joined with asset profiles, out of core.")
+    parser.add_argument("findings", help="CSV file with the columns finding_id, asset_id, vector")
+    parser.add_argument("assets", help="CSV file with the columns asset_id, profile (e.g. CR:H/IR:M/MAV:L)")
+    parser.add_argument("--out", required=True, help="Output CSV file")
+    parser.add_argument("--work-dir", required=True, help="Directory for partitions; reuse it to resume a job")
+    parser.add_argument("--memory", type=int, default=512, help="Memory budget in MiB")
+    parser.add_argument("--partitions", type=int, help="Number of partitions (derived from --memory by default)")
+    parser.add_argument("--keep", action="store_true", help="Keep the partition files when done")
+    args = parser.parse_args()
+
+    job = OutOfCoreJob(args.findings, args.assets, args.work_dir, args.memory << 20, args.partitions)
+    summary = job.run(args.out)
+    if not args.keep:
+        job.cleanup()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Iterable, Iterator, Optional, TextIO
+
+from cvss import CVSSv4
+from cvss_calc import apply_answers, questions
+from nvd import Nvd, iter_feed
+
+# Streaming pipeline: source -> stages -> sink, every hop through a bounded queue.
+#
+#     pipeline = (Pipeline(feed_records(paths))
+#                 .map(Tailor({"CR": "H", "MAV": "L"}), name="tailor")
+#                 .map(score_record, name="score", workers=8, mode="process"))
+#     with open("scores.jsonl", "w") as out:
+#         pipeline.run(JsonlSink(out))
+#     print(pipeline.stats())
+#
+# Thread stages suit I/O (NVD lookups); process stages suit scoring. A stage function takes one
+# record and returns the next one, or None to drop it. Bounded queues and a bounded number of
+# in-flight process tasks keep memory constant however long the source is: a slow stage simply
+# blocks the ones before it. cancel() stops every stage and the source at the next record.
+
+Record = dict[str, Any]
+
+_END = object()
+_POLL_INTERVAL = 0.1
+
+
+class Cancelled(Exception):
+    pass
+
+
+class StageStats:
+    """
+    Per-stage counters. `busy` is the time spent inside the stage function, summed over workers;
+    for process stages it is the time chunks spent in flight.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.items = 0
+        self.dropped = 0
+        self.busy = 0.0
+        self.__lock = threading.Lock()
+
+    def record(self, elapsed: float, dropped: bool, items: int = 1) -> None:
+        with self.__lock:
+            self.items += items
+            self.busy += elapsed
+            if dropped:
+                self.dropped += 1
+
+    def __repr__(self) -> str:
+        return f"StageStats({self.name!r}, items={self.items}, dropped={self.dropped}, busy={self.busy:.2f}s)"
+
+
+def _apply_chunk(fn: Callable[[Any], Any], items: list[Any]) -> list[Any]:
+    return [fn(item) for item in items]
+
+
+class _Stage:
+
+    def __init__(self, fn: Callable[[Any], Any], name: str, workers: int, mode: str, maxsize: int, chunksize: int) -> None:
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown stage mode: {mode}")
+        self.fn = fn
+        self.workers = workers
+        self.mode = mode
+        self.maxsize = maxsize
+        self.chunksize = chunksize
+        self.stats = StageStats(name)
+
+
+class Pipeline:
+
+    def __init__(self, source: Iterable[Any], maxsize: int = 1000) -> None:
+        """
+        Args:
+            source (Iterable[Any]): The records to process, typically a generator.
+            maxsize (int): Default capacity of the queue behind each stage.
+        """
+        self.__source = source
+        self.__maxsize = maxsize
+        self.__stages: list[_Stage] = []
+        self.__cancelled = threading.Event()
+        self.__error: Optional[BaseException] = None
+        self.__source_stats = StageStats("source")
+        self.__started = 0.0
+        self.__finished: Optional[float] = None
+
+    def map(self, fn: Callable[[Any], Any], name: Optional[str] = None, workers: int = 1, mode: str = "thread",
+            maxsize: Optional[int] = None, chunksize: int = 64) -> "Pipeline":
+        """
+        Appends a stage.
+
+        Args:
+            fn (Callable[[Any], Any]): Maps a record to the next record, or None to drop it. Must be picklable
+                (a module-level function or class instance) in process mode.
+            name (Optional[str]): Name used in the statistics.
+            workers (int): Number of threads or processes.
+            mode (str): "thread" or "process".
+            maxsize (Optional[int]): Capacity of the output queue of this stage.
+            chunksize (int): Records sent to a process per task, in process mode.
+
+        Returns:
+            Pipeline: The pipeline itself, to allow chaining.
+        """
+        name = name or getattr(fn, "__name__", type(fn).__name__)
+        self.__stages.append(_Stage(fn, name, workers, mode, maxsize or self.__maxsize, chunksize))
+        return self
+
+    def cancel(self) -> None:
+        self.__cancelled.set()
+
+    def stats(self) -> list[tuple[str, int, float]]:
+        """
+        Returns (stage name, records processed, records per second since the start) for the source and every stage.
+        """
+        elapsed = (self.__finished or time.perf_counter()) - self.__started
+        return [
+            (stats.name, stats.items, stats.items / elapsed if elapsed > 0 else 0.0)
+            for stats in [self.__source_stats] + [stage.stats for stage in self.__stages]
+        ]
+
+    def __put(self, q: "queue.Queue[Any]", item: Any) -> None:
+        while True:
+            if self.__cancelled.is_set():
+                raise Cancelled
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                pass
+
+    def __get(self, q: "queue.Queue[Any]") -> Any:
+        while True:
+            if self.__cancelled.is_set():
+                raise Cancelled
+            try:
+                return q.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                pass
+
+    def __guard(self, target: Callable[..., None], *args: Any) -> Callable[[], None]:
+        def run() -> None:
+            try:
+                target(*args)
+            except Cancelled:
+                pass
+            except BaseException as e:
+                if self.__error is None:
+                    self.__error = e
+                self.__cancelled.set()
+        return run
+
+    def __feed(self, out_q: "queue.Queue[Any]") -> None:
+        for item in self.__source:
+            self.__put(out_q, item)
+            self.__source_stats.record(0.0, False)
+        self.__put(out_q, _END)
+
+    def __thread_worker(self, stage: _Stage, in_q: "queue.Queue[Any]", out_q: "queue.Queue[Any]",
+                        remaining: list[int], lock: threading.Lock) -> None:
+        while True:
+            item = self.__get(in_q)
+            if item is _END:
+                # Let sibling workers see the end too; the last one to finish forwards it
+                self.__put(in_q, _END)
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    self.__put(out_q, _END)
+                return
+            start = time.perf_counter()
+            result = stage.fn(item)
+            stage.stats.record(time.perf_counter() - start, result is None)
+            if result is not None:
+                self.__put(out_q, result)
+
+    def __process_dispatcher(self, stage: _Stage, in_q: "queue.Queue[Any]", out_q: "queue.Queue[Any]") -> None:
+        # Bounded number of chunks in flight; results are forwarded in input order
+        in_flight: deque[tuple[Future, float]] = deque()
+        max_in_flight = max(stage.workers * 2, stage.maxsize // stage.chunksize)
+
+        def drain_one() -> None:
+            future, submitted = in_flight.popleft()
+            while True:
+                if self.__cancelled.is_set():
+                    raise Cancelled
+                try:
+                    results = future.result(timeout=_POLL_INTERVAL)
+                    break
+                except FutureTimeoutError:
+                    pass
+            stage.stats.record(time.perf_counter() - submitted, False, 0)
+            for result in results:
+                stage.stats.record(0.0, result is None)
+                if result is not None:
+                    self.__put(out_q, result)
+
+        with ProcessPoolExecutor(stage.workers) as executor:
+            try:
+                chunk: list[Any] = []
+                while True:
+                    item = self.__get(in_q)
+                    if item is not _END:
+                        chunk.append(item)
+                    if chunk and (item is _END or len(chunk) >= stage.chunksize):
+                        in_flight.append((executor.submit(_apply_chunk, stage.fn, chunk), time.perf_counter()))
+                        chunk = []
+                        if len(in_flight) >= max_in_flight:
+                            drain_one()
+                    if item is _END:
+                        break
+                while in_flight:
+                    drain_one()
+                self.__put(out_q, _END)
+            except Cancelled:
+                for future, _ in in_flight:
+                    future.cancel()
+                raise
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Runs the pipeline and yields the records leaving the last stage.
+
+        Raises the first exception raised by the source or a stage. Stopping the iteration early cancels the pipeline.
+        """
+        self.__started = time.perf_counter()
+        self.__finished = None
+        queues: list["queue.Queue[Any]"] = [queue.Queue(self.__maxsize)]
+        threads = [threading.Thread(target=self.__guard(self.__feed, queues[0]), daemon=True)]
+        for stage in self.__stages:
+            in_q = queues[-1]
+            out_q: "queue.Queue[Any]" = queue.Queue(stage.maxsize)
+            queues.append(out_q)
+            if stage.mode == "thread":
+                remaining, lock = [stage.workers], threading.Lock()
+                threads += [
+                    threading.Thread(target=self.__guard(self.__thread_worker, stage, in_q, out_q, remaining, lock),
+                                     daemon=True)
+                    for _ in range(stage.workers)
+                ]
+            else:
+                threads.append(threading.Thread(target=self.__guard(self.__process_dispatcher, stage, in_q, out_q),
+                                                daemon=True))
+        for thread in threads:
+            thread.start()
+
+        completed = False
+        try:
+            while True:
+                try:
+                    item = self.__get(queues[-1])
+                except Cancelled:
+                    break
+                if item is _END:
+                    completed = True
+                    break
+                yield item
+        finally:
+            if not completed:
+                self.__cancelled.set()
+            for thread in threads:
+                thread.join()
+            self.__finished = time.perf_counter()
+        if self.__error is not None:
+            raise self.__error
+
+    def run(self, sink: Callable[[Any], None]) -> None:
+        """
+        Runs the pipeline to completion, handing every output record to `sink`.
+        """
+        for item in self:
+            sink(item)
+
+
+# Building blocks for the usual CVE jobs
+
+def feed_records(paths: Iterable[str]) -> Iterator[Record]:
+    """
+    Yields a record for every CVE with CVSS 4.0 data in local NVD 2.0 feed files.
+    """
+    for cve_id, result in iter_feed(paths):
+        if result is not None:
+            vector, base_score, version = result
+            yield {"cve_id": cve_id, "vector": vector, "base_score": base_score, "cvss_version": version}
+
+
+class NvdFetcher:
+    """
+    Stage that looks up {"cve_id": ...} records (or plain CVE ID strings) with Nvd, one client per thread.
+
+    Each client keeps at most `max_entries` lookups in memory, so that a stage over an unbounded
+    feed stays within constant memory.
+    """
+
+    def __init__(self, max_entries: int = 10000, **nvd_options: Any) -> None:
+        self.__nvd_options = dict(nvd_options, max_entries=max_entries)
+        self.__local = threading.local()
+
+    def __call__(self, record: Any) -> Optional[Record]:
+        nvd = getattr(self.__local, "nvd", None)
+        if nvd is None:
+            nvd = self.__local.nvd = Nvd(**self.__nvd_options)
+        cve_id = record if isinstance(record, str) else record["cve_id"]
+        result = nvd.get_cve(cve_id)
+        if result is None:
+            return None
+        vector, base_score, version = result
+        return {"cve_id": cve_id, "vector": vector, "base_score": base_score, "cvss_version": version}
+
+
+class Tailor:
+    """
+    Stage that applies environmental answers to the vector, as cvss_calc.iterate_questions does interactively.
+
+    Only the metrics in `answers` are set; the record's own values of the others are kept. Exploit
+    Maturity (E) describes the vulnerability rather than the environment, so it is rejected.
+    """
+
+    def __init__(self, answers: dict[str, str]) -> None:
+        for metric, value in answers.items():
+            if metric == "E":
+                raise ValueError(f"Exploit Maturity is not an environmental answer: {metric}:{value}")
+            if metric not in questions or value not in questions[metric]["options"]:
+                raise ValueError(f"Invalid answer: {metric}:{value}")
+        self.answers = answers
+
+    def __call__(self, record: Record) -> Record:
+        record["tailored_vector"] = apply_answers(record["vector"], self.answers, self.answers.keys())
+        return record
+
+
+def score_record(record: Record) -> Record:
+    cvss = CVSSv4(record.get("tailored_vector") or record["vector"])
+    record["score"] = cvss.get_score()
+    record["severity"] = cvss.get_severity()
+    record["nomenclature"] = cvss.get_nomenclature()
+    return record
+
+
+class JsonlSink:
+    """
+    Sink writing one JSON object per line.
+    """
+
+    def __init__(self, out: TextIO) -> None:
+        self.__out = out
+
+    def __call__(self, record: Record) -> None:
+        self.__out.write(json.dumps(record) + "\n")
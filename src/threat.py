@@ -0,0 +1,110 @@
+from typing import Iterable, Mapping, NamedTuple, Optional, Union
+
+from cvss import CVSSv4, severity_from_score
+from cvss_fast import parse_state, score_state, with_exploit_maturity
+from utils import set_metric
+
+
+class ThreatChange(NamedTuple):
+    key: str
+    vector: str
+    old_score: float
+    new_score: float
+    old_severity: str
+    new_severity: str
+
+
+# Values accepted by apply()
+EXPLOIT_MATURITY_VALUES = frozenset(("X", "A", "P", "U"))
+
+
+class ThreatRescorer:
+    """
+    Keeps scored findings and re-scores them when threat intelligence changes their Exploit Maturity.
+
+    Each finding keeps the parsed state and macro vector of its vector, so an update only swaps the
+    E value and its EQ5 digit before scoring again; vectors are parsed once, when added. Scores and
+    updated vector strings are cached per (vector, E) pair, at most four entries per distinct
+    vector, so a batch costs about one dictionary lookup per finding once the vectors in use have
+    been seen with each E value.
+    """
+
+    def __init__(self, records: Optional[Mapping[str, str]] = None) -> None:
+        """
+        Args:
+            records (Optional[Mapping[str, str]]): Finding key (e.g. CVE ID) to CVSS 4.0 vector string.
+        """
+        # key -> [vector as added, its state, its macro vector, score, E value applied since or None]
+        self.__records: dict[str, list] = {}
+        # (vector as added, E value) -> (score, updated vector); findings sharing a vector share the entry
+        self.__rescored: dict[tuple[str, str], tuple[float, str]] = {}
+        if records:
+            for key, vector in records.items():
+                self.add(key, vector)
+
+    def __len__(self) -> int:
+        return len(self.__records)
+
+    def add(self, key: str, vector: str) -> None:
+        state, macro_vector = parse_state(vector)
+        self.__records[key] = [vector, state, macro_vector, score_state(state, macro_vector), None]
+
+    def get(self, key: str) -> Optional[tuple[str, float]]:
+        record = self.__records.get(key)
+        if record is None:
+            return None
+        if record[4] is None:
+            return record[0], record[3]
+        return self.__rescore(record, record[4])[1], record[3]
+
+    def __rescore(self, record: list, exploit_maturity: str) -> tuple[float, str]:
+        cache_key = (record[0], exploit_maturity)
+        rescored = self.__rescored.get(cache_key)
+        if rescored is None:
+            state, macro_vector = with_exploit_maturity(record[1], record[2], exploit_maturity)
+            rescored = self.__rescored[cache_key] = (
+                score_state(state, macro_vector), set_metric(record[0], "E", exploit_maturity))
+        return rescored
+
+    def apply(self, updates: Union[Mapping[str, str], Iterable[tuple[str, str]]]) -> list[ThreatChange]:
+        """
+        Applies new Exploit Maturity values and returns the findings whose score or severity changed.
+
+        The whole batch is checked before any finding is updated, so a bad entry leaves every finding as it was.
+
+        Args:
+            updates (Union[Mapping[str, str], Iterable[tuple[str, str]]]): Finding key, or a vector string not
+                added yet, to the new E value ('X', 'A', 'P' or 'U').
+
+        Returns:
+            list[ThreatChange]: One entry per finding whose score changed, with its updated vector.
+
+        Raises:
+            KeyError: If a key is neither a known finding nor a vector string.
+            ValueError: If an E value is not valid, or a vector key is not a valid CVSS 4.0 vector.
+        """
+        items = list(updates.items() if isinstance(updates, Mapping) else updates)
+        for key, exploit_maturity in items:
+            if exploit_maturity not in EXPLOIT_MATURITY_VALUES:
+                raise ValueError(f"Invalid Exploit Maturity for {key}: {exploit_maturity}")
+            if key not in self.__records:
+                if "/" not in key:
+                    raise KeyError(f"Unknown finding: {key}")
+                CVSSv4.validate(key)
+
+        changes: list[ThreatChange] = []
+        for key, exploit_maturity in items:
+            record = self.__records.get(key)
+            if record is None:
+                # Keyed by the vector itself
+                self.add(key, key)
+                record = self.__records[key]
+
+            old_score = record[3]
+            new_score, vector = self.__rescore(record, exploit_maturity)
+            record[3], record[4] = new_score, exploit_maturity
+            # Severity bands are ranges of scores, so an unchanged score means an unchanged severity
+            if new_score != old_score:
+                changes.append(ThreatChange(
+                    key, vector, old_score, new_score, severity_from_score(old_score), severity_from_score(new_score)))
+        return changes
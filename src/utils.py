@@ -38,3 +38,26 @@ def trim_cvss_vector(vector: str) -> str:
     """
 
     return re.sub(r"\/(\w+:X)", "", vector)
+
+
+def set_metric(vector: str, metric: str, value: str) -> str:
+    """
+    Args:
+        vector (str): The CVSS vector string to update.
+        metric (str): The metric abbreviation, e.g. "E".
+        value (str): The new value. 'X' removes the metric from the vector.
+
+    Returns:
+        str: The vector with the metric replaced in place, appended if it was absent.
+    """
+    pairs = vector.split("/")
+    updated = [pair for pair in pairs if pair.split(":", 1)[0] != metric]
+    if value == "X":
+        return "/".join(updated)
+    for i, pair in enumerate(pairs):
+        if pair.split(":", 1)[0] == metric:
+            updated.insert(i, f"{metric}:{value}")
+            break
+    else:
+        updated.append(f"{metric}:{value}")
+    return "/".join(updated)